@@ -3,6 +3,11 @@
 import pandas as pd, numpy as np
 from pathlib import Path
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 # ---------- CONFIG ---------------------------------------------------
 CONFIG = dict(
     csv_path      = "/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv",
@@ -32,16 +37,9 @@ df = (pd.read_csv(CONFIG["csv_path"], parse_dates=["timestamp_utc"])
         [["open","high","low","close"]])
 
 df["date"] = df.index.date
-df["sma"]  = df["close"].rolling(CONFIG["ma_bars"], min_periods=CONFIG["ma_bars"]).mean()
-sig = df["close"].rolling(CONFIG["sigma_bars"], min_periods=CONFIG["sigma_bars"]).std()
-df["sigma"] = sig.clip(lower=CONFIG["sigma_floor_p"] / 10000)
-df["z"]     = (df["close"] - df["sma"]) / df["sigma"]
-
-# ATR gate
-prev = df["close"].shift()
-tr = np.maximum(df["high"]-df["low"],
-                np.maximum((df["high"]-prev).abs(), (df["low"]-prev).abs()))
-df["atr5"]   = tr.rolling(CONFIG["atr_bars"], min_periods=CONFIG["atr_bars"]).mean()
+ind = mr_block(df, CONFIG["ma_bars"], CONFIG["sigma_bars"], CONFIG["atr_bars"],
+               CONFIG["sigma_floor_p"] / 10000, min_periods=None)
+df["sma"], df["sigma"], df["z"], df["atr5"] = ind.sma, ind.sigma, ind.z, ind.atr   # ATR gate
 df["vol_ok"] = df["atr5"] * 1e4 >= CONFIG["atr_gate_pips"]
 
 # ---------- Back-test loop ------------------------------------------
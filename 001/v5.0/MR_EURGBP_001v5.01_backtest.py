@@ -1,21 +1,48 @@
 import pandas as pd, numpy as np, datetime as dt, pathlib
 
-PATHS = [
-    "/home/tradeops/ChatGPT_Memory/forex_1m_2025-02-28_EURGBP.csv",
-    "/home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_fragments_2025-02-28_and_03-02.csv",
-    "/home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_2025-03-02T22_to_2025-03-03T07.csv",
-    "/home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_fragments_FriMonWarmup.csv",
-    "/home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_2025-02-28T1701_to_2025-03-02T2359.csv",
-    "/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv"
-]
-
-def load_csv(path):
-    df = pd.read_csv(path)
-    df["timestamp_utc"] = pd.to_datetime(df["timestamp_utc"], utc=True, errors="coerce")
-    return df.dropna(subset=["timestamp_utc"])
-
-raw = pd.concat([load_csv(p) for p in PATHS])
-raw = raw.drop_duplicates("timestamp_utc").sort_values("timestamp_utc").reset_index(drop=True)
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications import fastcsv, manifest
+from applications.indicators import mr_block
+from applications.tools.ingest_fragments import DATA_ROOT, OHLC
+
+# The source fragments are merged ONCE into the M1 bar cache (first file
+# wins a duplicate minute, same as the old concat + drop_duplicates):
+#   python applications/tools/ingest_fragments.py EURGBP \
+#       /home/tradeops/ChatGPT_Memory/forex_1m_2025-02-28_EURGBP.csv \
+#       /home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_fragments_2025-02-28_and_03-02.csv \
+#       /home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_2025-03-02T22_to_2025-03-03T07.csv \
+#       /home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_fragments_FriMonWarmup.csv \
+#       /home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_2025-02-28T1701_to_2025-03-02T2359.csv \
+#       /home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv
+ap = argparse.ArgumentParser()
+ap.add_argument("--data-root", default=str(DATA_ROOT),
+                help="bar cache root written by ingest_fragments")
+ap.add_argument("--symbol", default="EURGBP")
+ap.add_argument("--months", help="comma list of YYYY-MM (default: every cached month)")
+args = ap.parse_args()
+
+CACHE  = pathlib.Path(args.data_root) / args.symbol / "M1"
+MONTHS = (args.months.split(",") if args.months else
+          sorted(fp.stem for fp in CACHE.glob("????-??.csv")))
+
+
+def load_month(fp):
+    """Cached month; only months the manifest has not validated get the
+    dropna / dedupe / sort passes."""
+    df = fastcsv.read_month(fp)
+    if manifest.is_trusted(fp):
+        return df
+    print(f"⚠️  {fp} not trusted in manifest.json – cleaning on load")
+    return (df.dropna(subset=OHLC).drop_duplicates("timestamp_utc")
+              .sort_values("timestamp_utc", kind="stable"))
+
+
+frames = [load_month(CACHE / f"{m}.csv") for m in MONTHS if (CACHE / f"{m}.csv").is_file()]
+if not frames:
+    sys.exit(f"⚠️  no cached {args.symbol} months in {CACHE} – run ingest_fragments first")
+raw = pd.concat(frames, ignore_index=True)
 
 TZ = "Europe/London"
 SESSION = ("07:00", "17:00")
@@ -39,12 +66,8 @@ df = raw.set_index("timestamp_utc").tz_convert(TZ).between_time(*SESSION)[["open
 df["date"] = df.index.date
 df = df.groupby("date", group_keys=False).apply(lambda g: g.iloc[WARMUP:])
 
-df["sma"]   = df.close.rolling(MA_BARS, min_periods=1).mean()
-df["sigma"] = df.close.rolling(SIG_BARS, min_periods=1).std().clip(lower=SIG_FLOOR)
-df["z"]     = (df.close - df.sma) / df.sigma
-prev        = df.close.shift()
-tr          = np.maximum(df.high - df.low, np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-df["atr"]   = tr.rolling(ATR_BARS, min_periods=1).mean()
+ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR)
+df["sma"], df["sigma"], df["z"], df["atr"] = ind.sma, ind.sigma, ind.z, ind.atr
 df["vol_ok"] = df.atr * 1e4 >= ATR_GATE_P
 
 trades, opens = [], []
@@ -2,6 +2,11 @@
 # V 5.0 – Exact original run form
 import pandas as pd, numpy as np, datetime as dt
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 CSV_PATH = "/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv"
 BASE_Z   = 1.95
 STEP_Z   = 0.25
@@ -25,13 +30,8 @@ df = (pd.read_csv(CSV_PATH, parse_dates=["timestamp_utc"])
         .between_time(*SESSION)
         [["open","high","low","close"]])
 df["date"] = df.index.date
-df["sma"]  = df.close.rolling(MA_BARS, min_periods=MA_BARS).mean()
-sig        = df.close.rolling(SIG_BARS, min_periods=SIG_BARS).std()
-df["sigma"]= sig.clip(lower=SIG_FLOOR)
-df["z"]    = (df.close - df.sma) / df.sigma
-prev       = df.close.shift()
-tr         = np.maximum(df.high-df.low, np.maximum((df.high-prev).abs(), (df.low-prev).abs()))
-df["atr"]  = tr.rolling(ATR_BARS, min_periods=ATR_BARS).mean()
+ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR, min_periods=None)
+df["sma"], df["sigma"], df["z"], df["atr"] = ind.sma, ind.sigma, ind.z, ind.atr
 df["vol_ok"] = df.atr*1e4 >= ATR_GATE
 
 trades, opens = [], []
@@ -1,6 +1,11 @@
 # V 5.0 – Fully patched with warm-up drop for Pandas 2.x compatibility
 import pandas as pd, numpy as np, datetime as dt, pathlib
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 CSV_PATH = "/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv"
 OUT_CSV = f"V5_0_trades_{dt.date.today()}.csv"
 
@@ -30,13 +35,8 @@ def load(csv):
     return df
 
 def backtest(df):
-    df["sma"] = df.close.rolling(MA_BARS, min_periods=MA_BARS).mean()
-    sig = df.close.rolling(SIG_BARS, min_periods=SIG_BARS).std()
-    df["sigma"] = sig.clip(lower=SIG_FLOOR)
-    df["z"] = (df.close - df.sma) / df.sigma
-    prev = df.close.shift()
-    tr = np.maximum(df.high - df.low, np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-    df["atr"] = tr.rolling(ATR_BARS, min_periods=ATR_BARS).mean()
+    ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR, min_periods=None)
+    df["sma"], df["sigma"], df["z"], df["atr"] = ind.sma, ind.sigma, ind.z, ind.atr
     df["vol_ok"] = df.atr * 1e4 >= ATR_GATE_P
 
     # Patch for Pandas version drift
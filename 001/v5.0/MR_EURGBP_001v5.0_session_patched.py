@@ -2,6 +2,11 @@ import pandas as pd
 import numpy as np
 from datetime import timedelta
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 CSV_PATH = '/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv'
 df = pd.read_csv(CSV_PATH, parse_dates=['timestamp_utc'])
 df = df.set_index('timestamp_utc').tz_convert('Europe/London')
@@ -18,9 +23,8 @@ for d in unique_days:
     if len(day_df) < 100:
         continue
 
-    day_df['sma'] = day_df['close'].rolling(30, min_periods=30).mean()
-    sig = day_df['close'].rolling(5, min_periods=5).std().clip(lower=0.0003)
-    day_df['z'] = (day_df['close'] - day_df['sma']) / sig
+    ind = mr_block(day_df, 30, 5, 5, 0.0003, min_periods=None)
+    day_df['sma'], day_df['z'] = ind.sma, ind.z
 
     day_df['hi'] = day_df['high'].where(day_df.index.time == pd.to_datetime('07:00').time(), np.nan)
     day_df['lo'] = day_df['low'].where(day_df.index.time == pd.to_datetime('07:00').time(), np.nan)
@@ -1,6 +1,11 @@
 
 import pandas as pd, numpy as np, datetime as dt
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 CSV = "/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv"
 BASE_Z = 1.95
 STEP_Z = 0.25
@@ -29,13 +34,8 @@ def load(csv):
 
 
 def backtest(df):
-    df["sma"] = df.close.rolling(MA_BARS).mean()
-    sig = df.close.rolling(SIG_BARS).std().clip(lower=SIG_FLOOR)
-    df["sigma"] = sig
-    df["z"] = (df.close - df.sma) / df.sigma
-    prev = df.close.shift()
-    tr = np.maximum(df.high - df.low, np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-    df["atr"] = tr.rolling(ATR_BARS).mean()
+    ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR, min_periods=None)
+    df["sma"], df["sigma"], df["z"], df["atr"] = ind.sma, ind.sigma, ind.z, ind.atr
     df["vol_ok"] = df.atr * 1e4 >= ATR_GATE_P
     df = df.iloc[max(MA_BARS, SIG_BARS, ATR_BARS):]
 
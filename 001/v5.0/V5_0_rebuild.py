@@ -1,6 +1,11 @@
 import pandas as pd, numpy as np
 from datetime import timedelta
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 # Settings
 CSV_PATH = '/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv'
 OUT_PATH = '/home/tradeops/strats/meanrev/EURGBP/development/001/v5.0/V5_0_trades_2025-05-13.csv'
@@ -21,12 +26,8 @@ out, opens = [], []
 today, hi, lo = None, None, None
 
 # Indicators
-prev = df['close'].shift()
-df['tr'] = np.maximum(df.high - df.low, np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-df['sma'] = df['close'].rolling(MA_BARS, min_periods=MA_BARS).mean()
-df['sigma'] = df['close'].rolling(SIG_BARS, min_periods=SIG_BARS).std().clip(lower=SIG_FLOOR)
-df['z'] = (df['close'] - df['sma']) / df['sigma']
-df['atr'] = df['tr'].rolling(ATR_BARS, min_periods=ATR_BARS).mean()
+ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR, min_periods=None)
+df['tr'], df['sma'], df['sigma'], df['z'], df['atr'] = ind.tr, ind.sma, ind.sigma, ind.z, ind.atr
 df['vol_ok'] = df['atr'] * 1e4 >= ATR_GATE_P
 
 # Session dates
@@ -1,5 +1,10 @@
 import pandas as pd, numpy as np, datetime as dt, pathlib
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 # ── path to data ─────────────────────────────────────────────────────
 CSV_PATH = "/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv"   # adjusted
 OUT_CSV  = f"V5_0_trades_{dt.date.today()}.csv"
@@ -34,15 +39,8 @@ df["date"] = df.index.date
 df = df.groupby("date", group_keys=False).apply(lambda g: g.iloc[WARMUP:])
 
 # ── indicators ──────────────────────────────────────────────────────
-df["sma"]   = df.close.rolling(MA_BARS, min_periods=1).mean()
-sig         = df.close.rolling(SIG_BARS, min_periods=1).std()
-df["sigma"] = sig.clip(lower=SIG_FLOOR)
-df["z"]     = (df.close - df.sma) / df.sigma
-
-prev        = df.close.shift()
-tr          = np.maximum(df.high-df.low,
-                         np.maximum((df.high-prev).abs(), (df.low-prev).abs()))
-df["atr"]   = tr.rolling(ATR_BARS, min_periods=1).mean()
+ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR)
+df["sma"], df["sigma"], df["z"], df["atr"] = ind.sma, ind.sigma, ind.z, ind.atr
 df["vol_ok"]= df.atr * 1e4 >= ATR_GATE_P
 
 # ── back-test loop ──────────────────────────────────────────────────
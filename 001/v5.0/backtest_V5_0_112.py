@@ -1,5 +1,10 @@
 import pandas as pd, numpy as np, datetime as dt, pathlib
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 PATHS = [
     "/home/tradeops/ChatGPT_Memory/forex_1m_2025-02-28_EURGBP.csv",
     "/home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_fragments_2025-02-28_and_03-02.csv",
@@ -39,12 +44,8 @@ df = raw.set_index("timestamp_utc").tz_convert(TZ).between_time(*SESSION)[["open
 df["date"] = df.index.date
 df = df.groupby("date", group_keys=False).apply(lambda g: g.iloc[WARMUP:])
 
-df["sma"]   = df.close.rolling(MA_BARS, min_periods=1).mean()
-df["sigma"] = df.close.rolling(SIG_BARS, min_periods=1).std().clip(lower=SIG_FLOOR)
-df["z"]     = (df.close - df.sma) / df.sigma
-prev        = df.close.shift()
-tr          = np.maximum(df.high - df.low, np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-df["atr"]   = tr.rolling(ATR_BARS, min_periods=1).mean()
+ind = mr_block(df, MA_BARS, SIG_BARS, ATR_BARS, SIG_FLOOR)
+df["sma"], df["sigma"], df["z"], df["atr"] = ind.sma, ind.sigma, ind.z, ind.atr
 df["vol_ok"] = df.atr * 1e4 >= ATR_GATE_P
 
 trades, opens = [], []
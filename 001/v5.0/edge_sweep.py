@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
 
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+from applications.indicators import mr_block
+
 CSV_PATH = '/home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv'
 df = pd.read_csv(CSV_PATH, parse_dates=['timestamp_utc'])
 df = df.set_index('timestamp_utc').between_time('07:00', '17:00')
@@ -9,11 +14,11 @@ df.index = df.index.tz_convert('Europe/London')
 print('| Edge % | Trades | Win Rate | Expect | Total Pips | Sharpe | Max DD |')
 print('|--------|--------|----------|--------|-------------|--------|--------|')
 
+ind = mr_block(df, 30, 5, 5, 0.0003, min_periods=None)   # same for every edge
+
 for edge_pct in range(2, 21, 2):
     df_ = df.copy()
-    df_['sma'] = df_['close'].rolling(30).mean()
-    sig = df_['close'].rolling(5).std().clip(lower=0.0003)
-    df_['z'] = (df_['close'] - df_['sma']) / sig
+    df_['sma'], df_['z'] = ind.sma, ind.z
     df_['entry'] = df_['z'].abs() >= 1.95
     df_ = df_[df_['entry']].copy()
     df_['pnl'] = np.sign(-df_['z']) * (10 + edge_pct * 0.1)
@@ -12,6 +12,8 @@
 # -----------------------------------------------------
 import pandas as pd
 import numpy as np
+from applications.indicators import mr_indicators, day_range, edge_mask, windows
+from applications.sessions import calendar
 
 # ----- public schema ---------------------------------
 PARAM_SCHEMA = {
@@ -20,13 +22,13 @@ PARAM_SCHEMA = {
     "drift"    : {"type": "float", "default": 0.001},     # 0.10 %
     "edge_pct" : {"type": "float", "default": 0.15},      # 15 %
     "max_tix"  : {"type": "int",   "default": 5},
+    "ma_bars"  : {"type": "int",   "default": 30},
+    "sig_bars" : {"type": "int",   "default": 5},
+    "atr_bars" : {"type": "int",   "default": 5},
+    "sig_floor": {"type": "float", "default": 0.00030},   # 3 p
 }
 
 # ----- fixed constants (V 5.0) -----------------------
-MA_BARS   = 30
-SIG_BARS  = 5
-ATR_BARS  = 5
-SIG_FLOOR = 0.00030     # 3 p
 STOP_PIPS = 10          # hard stop
 TIME_MIN  = 30          # time stop (min)
 ATR_GATE  = 1.3         # pips
@@ -35,28 +37,15 @@ ATR_GATE  = 1.3         # pips
 def backtest(df: pd.DataFrame, p: dict) -> pd.Series:
     """Pure function – no external I/O."""
     # -- indicators --
-    sma   = df.close.rolling(MA_BARS, 1).mean()
-    sigma = df.close.rolling(SIG_BARS, 1).std().clip(lower=SIG_FLOOR)
-    z     = (df.close - sma) / sigma
-    prev  = df.close.shift()
-    tr    = np.maximum(df.high - df.low,
-                       np.maximum((df.high - prev).abs(),
-                                  (df.low  - prev).abs()))
-    atr   = tr.rolling(ATR_BARS, 1).mean() * 1e4  # pips
+    ind   = mr_indicators(df, *windows(p))
+    sma, z, atr = ind.sma, ind.z, ind.atr    # atr in pips
 
     trades, opens = [], []
-    today = None
-    hi = lo = None
+    days  = calendar(df.index, tz=None).day            # session-day ids
+    edge  = edge_mask(z, day_range(df, days).pos, p["edge_pct"]).tolist()
 
     print("BACKTEST START:", df.index[:5], df.columns.tolist())
-    for ts, row in df.iterrows():
-        # new session range reset
-        if row.name.date() != today:
-            today = row.name.date()
-            hi, lo = row.high, row.low
-        hi, lo = max(hi, row.high), min(lo, row.low)
-        rng = hi - lo
-
+    for i, (ts, row) in enumerate(df.iterrows()):
         # ---- exits ----
         still = []
         for side, ep, et, layer in opens:
@@ -82,9 +71,7 @@ def backtest(df: pd.DataFrame, p: dict) -> pd.Series:
         if pd.isna(z.loc[ts]) or atr.loc[ts] < ATR_GATE: continue
         if abs(row.close - sma.loc[ts]) / sma.loc[ts] < p["drift"]: continue
 
-        pos = (row.close - lo) / rng if rng else 0.5
-        if z.loc[ts] > 0 and pos > (1 - p["edge_pct"]): continue  # long blocked high
-        if z.loc[ts] < 0 and pos < p["edge_pct"]:       continue  # short blocked low
+        if edge[i]: continue             # z stretched into the day's edge
 
         longs  = sum(1 for s,_,_,_ in opens if s == "long")
         shorts = sum(1 for s,_,_,_ in opens if s == "short")
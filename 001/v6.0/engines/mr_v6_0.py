@@ -3,42 +3,34 @@ import numpy as np
 import matplotlib.pyplot as plt
 import os
 from datetime import datetime
+from applications.indicators import mr_indicators, day_range, edge_mask, windows
+from applications.sessions import calendar
 
 PARAM_SCHEMA = {
     "base_z": 1.95,
     "step_z": 0.25,
     "drift": 0.001,
     "edge_pct": 0.15,
-    "max_tix": 5
+    "max_tix": 5,
+    "ma_bars": 30,
+    "sig_bars": 5,
+    "atr_bars": 5,
+    "sig_floor": 0.00030
 }
 
-MA_BARS = 30
-SIG_BARS = 5
-ATR_BARS = 5
-SIG_FLOOR = 0.00030
 STOP_PIPS = 10
 TIME_MIN = 30
 ATR_GATE = 1.3
 
 def backtest(df: pd.DataFrame, p: dict) -> dict:
-    sma = df.close.rolling(MA_BARS, 1).mean()
-    sigma = df.close.rolling(SIG_BARS, 1).std().clip(lower=SIG_FLOOR)
-    z = (df.close - sma) / sigma
-    prev = df.close.shift()
-    tr = np.maximum(df.high - df.low, np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-    atr = tr.rolling(ATR_BARS, 1).mean() * 1e4
+    ind = mr_indicators(df, *windows(p))
+    sma, z, atr = ind.sma, ind.z, ind.atr
 
     logs, opens = [], []
-    today = None
-    hi = lo = None
-
-    for ts, row in df.iterrows():
-        if row.name.date() != today:
-            today = row.name.date()
-            hi, lo = row.high, row.low
-        hi, lo = max(hi, row.high), min(lo, row.low)
-        rng = hi - lo
+    days  = calendar(df.index, tz=None).day            # session-day ids
+    edge  = edge_mask(z, day_range(df, days).pos, p["edge_pct"]).tolist()
 
+    for i, (ts, row) in enumerate(df.iterrows()):
         still = []
         for side, ep, et, layer in opens:
             hold = (ts - et).total_seconds() / 60
@@ -62,9 +54,7 @@ def backtest(df: pd.DataFrame, p: dict) -> dict:
         if pd.isna(z.loc[ts]) or atr.loc[ts] < ATR_GATE: continue
         if abs(row.close - sma.loc[ts]) / sma.loc[ts] < p["drift"]: continue
 
-        pos = (row.close - lo) / rng if rng else 0.5
-        if z.loc[ts] > 0 and pos > (1 - p["edge_pct"]): continue
-        if z.loc[ts] < 0 and pos < p["edge_pct"]: continue
+        if edge[i]: continue             # z stretched into the day's edge
 
         longs = sum(1 for s,_,_,_ in opens if s == "long")
         shorts = sum(1 for s,_,_,_ in opens if s == "short")
@@ -15,16 +15,30 @@ CFG = {               # defaults used when wrapper calls run_backtest(df)
     "max_tix":  5,
     "stop_pips": 10,
     "time_min": 30,
+    "ma_bars":  30,
+    "sig_bars": 5,
+    "atr_bars": 5,
+    "sig_floor": 0.00030,
 }
 
 def run_backtest(df, cfg=None):
     cfg = cfg or CFG.copy()
     return backtest(df, cfg)
+
+def run_backtest_stream(frames, cfg=None):
+    cfg = cfg or CFG.copy()
+    return backtest_stream(frames, cfg)
 # -----------------------------------------------------------------------
 
 import pandas as pd, numpy as np, os
 from datetime import datetime
 from applications.metrics import generate_backtest_output    # local copy
+from applications import exposure, perf
+from applications.guards import GuardStats, SEEN, CAP, ATR, DRIFT, EDGE, NO_SIGNAL
+from applications.indicators import (mr_indicators, day_range, edge_mask,
+                                     warm_bars, windows)
+from applications.sessions import calendar
+from applications.tradebook import TradeBook, LONG, SHORT, STOP, MEAN, TIME
 
 PARAM_SCHEMA = {
     "base_z":   {"type": "float", "default": 1.95},
@@ -34,85 +48,116 @@ PARAM_SCHEMA = {
     "max_tix":  {"type": "int",   "default": 5},
     "stop_pips": {"type": "int",  "default": 10},
     "time_min":  {"type": "int",  "default": 30},
+    "ma_bars":   {"type": "int",   "default": 30,      "min": 10,     "max": 60},
+    "sig_bars":  {"type": "int",   "default": 5,       "min": 3,      "max": 20},
+    "atr_bars":  {"type": "int",   "default": 5,       "min": 3,      "max": 20},
+    "sig_floor": {"type": "float", "default": 0.00030, "min": 0.0001, "max": 0.0006},
 }
 
-MA_BARS   = 30
-SIG_BARS  = 5
-ATR_BARS  = 5
-SIG_FLOOR = 0.00030
 ATR_GATE  = 1.3
 
 def backtest(df: pd.DataFrame, p: dict) -> dict:
-    sma   = df.close.rolling(MA_BARS, 1).mean()
-    sigma = df.close.rolling(SIG_BARS, 1).std().clip(lower=SIG_FLOOR)
-    z     = (df.close - sma) / sigma
-    prev  = df.close.shift()
-    tr    = np.maximum(df.high - df.low,
-            np.maximum((df.high - prev).abs(), (df.low - prev).abs()))
-    atr   = tr.rolling(ATR_BARS, 1).mean() * 1e4
-
-    logs, opens, eq_curve = [], [], []
-    eq = 0
-    hi = lo = None
-    today = None
-
-    for ts, row in df.iterrows():
-        # reset daily hi/lo
-        if ts.date() != today:
-            today, hi, lo = ts.date(), row.high, row.low
-        hi, lo = max(hi, row.high), min(lo, row.low)
-        rng = hi - lo
-
-        # manage open trades
-        still = []
-        for side, ep, et, layer in opens:
-            hold = (ts - et).total_seconds() / 60
-            exit_flag, px, reason = False, None, None
-
-            stop = p["stop_pips"] / 1e4
-            if side == "long":
-                if row.low  <= ep - stop:  px, exit_flag, reason = ep - stop, True, "stop"
-                elif row.close >= sma.loc[ts]: px, exit_flag, reason = row.close, True, "mean"
-                elif hold >= p["time_min"]:   px, exit_flag, reason = row.close, True, "time"
-            else:
-                if row.high >= ep + stop: px, exit_flag, reason = ep + stop, True, "stop"
-                elif row.close <= sma.loc[ts]: px, exit_flag, reason = row.close, True, "mean"
-                elif hold >= p["time_min"]:   px, exit_flag, reason = row.close, True, "time"
-
-            if exit_flag:
-                pips = (px - ep)*1e4 if side == "long" else (ep - px)*1e4
-                eq  += pips
-                logs.append({
-                    "pips": pips,
-                    "entry_time": et,
-                    "exit_time": ts,
-                    "reason": reason
-                })
-                eq_curve.append({"ts": ts.isoformat(), "equity": eq})
-            else:
-                still.append((side, ep, et, layer))
-        opens = still
-
-        # entry filters
-        if len(opens) >= p["max_tix"]: continue
-        if pd.isna(z.loc[ts]) or atr.loc[ts] < ATR_GATE: continue
-        if abs(row.close - sma.loc[ts]) / sma.loc[ts] < p["drift"]: continue
-
-        pos = (row.close - lo) / rng if rng else 0.5
-        if z.loc[ts] > 0 and pos > (1 - p["edge_pct"]): continue
-        if z.loc[ts] < 0 and pos < p["edge_pct"]: continue
-
-        longs  = sum(1 for s,_,_,_ in opens if s == "long")
-        shorts = sum(1 for s,_,_,_ in opens if s == "short")
-
-        if z.loc[ts] <= -p["base_z"]:
-            need = p["base_z"] + p["step_z"]*longs
-            if abs(z.loc[ts]) >= need:
-                opens.append(("long", row.close, ts, longs+1))
-        elif z.loc[ts] >= p["base_z"]:
-            need = p["base_z"] + p["step_z"]*shorts
-            if abs(z.loc[ts]) >= need:
-                opens.append(("short", row.close, ts, shorts+1))
-
-    trade_log = pd.DataFrame(logs)
+    return backtest_stream([df], p)
+
+def backtest_stream(frames, p: dict):
+    """Chunked variant: open trades, daily hi/lo and the last warm_bars()
+    rows carry over between frames (see backtest_wrapper.iter_bars)."""
+    win  = windows(p)                # ma / sig / atr windows + sigma floor
+    keep = warm_bars(*win)
+    opens = []
+    book = TradeBook()
+    tz = None
+    today = carry = None             # carry: (day, hi, lo) across chunks
+    tail = None
+    gs = GuardStats()                # entry-guard rejections, see guards.py
+    g_hr, g_day = gs.hour, None
+    seen = [] if p.get("exposure") else None       # bars for exposure.from_book
+
+    for df in frames:
+        if df.empty:
+            continue
+        warm = 0 if tail is None else len(tail)
+        if warm:
+            df = pd.concat([tail, df])
+        tail = df.iloc[-keep:]
+        tz = df.index.tz
+        if seen is not None:
+            seen.append(df.iloc[warm:][["high", "low", "close"]])
+
+        with perf.phase("indicators"):
+            ind   = mr_indicators(df, *win)
+            sma, z, atr = ind.sma, ind.z, ind.atr
+            cal   = calendar(df.index, tz=None)      # day ids in the index's zone
+            rr    = day_range(df, cal.day, carry)    # running daily hi/lo/pos
+            carry = (cal.day[-1], rr.hi.iat[-1], rr.lo.iat[-1])
+            edge  = edge_mask(z, rr.pos, p["edge_pct"])[warm:].tolist()
+
+        days  = cal.day[warm:].tolist()
+        hours = (cal.mod[warm:] // 60).tolist()
+
+        perf.count("bars", len(df) - warm)
+        with perf.phase("loop"):
+            for i, (ts, row) in enumerate(df.iloc[warm:].iterrows()):
+                # new day: fresh guard counters (hi/lo come from day_range)
+                if days[i] != today:
+                    today = days[i]
+                    g_day = gs.new_day(cal.day_label(today))
+
+                # manage open trades
+                still = []
+                for side, ep, et, layer in opens:
+                    hold = (ts - et).total_seconds() / 60
+                    exit_flag, px, reason = False, None, None
+
+                    stop = p["stop_pips"] / 1e4
+                    if side == "long":
+                        if row.low  <= ep - stop:  px, exit_flag, reason = ep - stop, True, STOP
+                        elif row.close >= sma.loc[ts]: px, exit_flag, reason = row.close, True, MEAN
+                        elif hold >= p["time_min"]:   px, exit_flag, reason = row.close, True, TIME
+                    else:
+                        if row.high >= ep + stop: px, exit_flag, reason = ep + stop, True, STOP
+                        elif row.close <= sma.loc[ts]: px, exit_flag, reason = row.close, True, MEAN
+                        elif hold >= p["time_min"]:   px, exit_flag, reason = row.close, True, TIME
+
+                    if exit_flag:
+                        if side == "long":
+                            book.add((px - ep)*1e4, et.value, ts.value, LONG,  reason, layer)
+                        else:
+                            book.add((ep - px)*1e4, et.value, ts.value, SHORT, reason, layer)
+                    else:
+                        still.append((side, ep, et, layer))
+                opens = still
+
+                # entry filters (rejections counted per hour / day)
+                h = hours[i]
+                g_hr[SEEN, h] += 1; g_day[SEEN] += 1
+                if len(opens) >= p["max_tix"]:
+                    g_hr[CAP, h] += 1; g_day[CAP] += 1; continue
+                if pd.isna(z.loc[ts]) or atr.loc[ts] < ATR_GATE:
+                    g_hr[ATR, h] += 1; g_day[ATR] += 1; continue
+                if abs(row.close - sma.loc[ts]) / sma.loc[ts] < p["drift"]:
+                    g_hr[DRIFT, h] += 1; g_day[DRIFT] += 1; continue
+
+                if edge[i]:
+                    g_hr[EDGE, h] += 1; g_day[EDGE] += 1; continue
+
+                longs  = sum(1 for s,_,_,_ in opens if s == "long")
+                shorts = sum(1 for s,_,_,_ in opens if s == "short")
+
+                n_open = len(opens)
+                if z.loc[ts] <= -p["base_z"]:
+                    need = p["base_z"] + p["step_z"]*longs
+                    if abs(z.loc[ts]) >= need:
+                        opens.append(("long", row.close, ts, longs+1))
+                elif z.loc[ts] >= p["base_z"]:
+                    need = p["base_z"] + p["step_z"]*shorts
+                    if abs(z.loc[ts]) >= need:
+                        opens.append(("short", row.close, ts, shorts+1))
+                if len(opens) == n_open:
+                    g_hr[NO_SIGNAL, h] += 1; g_day[NO_SIGNAL] += 1
+
+    trade_log, eq_curve = book.build(tz, cols=["pips", "entry_time", "exit_time", "reason"])
+    trade_log.attrs["entry_guards"] = gs.report()
+    if seen:                                       # per-bar MTM / exposure
+        trade_log.attrs["exposure"] = exposure.from_book(pd.concat(seen), book, opens)
     return trade_log, eq_curve        # wrapper builds metrics later
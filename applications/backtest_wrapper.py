@@ -6,21 +6,28 @@ CLI example:
            --engine 001/v6.02 --from 2025-03-01 --to 2025-03-31 \
            --tf M1 --params base_z=2.1,step_z=0.3
 
+Bars come from the CSV month cache, else from --source; identical runs
+are memoised (applications/memo.py).  Options are described in --help.
+
 Writes JSON to:
-    <ENGINE_ROOT>/<engine>/results/<UTC-timestamp>.json
+    <engine folder>/results/<UTC-timestamp>.txt      (.json.gz with --gzip)
 Echoes one line (parsed by /kick_bt):
-    JSON: <engine>/results/<file>.json
+    JSON: <engine>/results/<file>
 """
 
 # ── make project root importable ────────────────────────────────────
-import sys, pathlib, argparse, json, datetime
+import sys, pathlib, argparse, json, datetime, time, tracemalloc
 ROOT = pathlib.Path(__file__).resolve().parent.parent   # /home/tradeops/strats
 sys.path.insert(0, str(ROOT))
 
 # ── project / third-party imports ───────────────────────────────────
 from applications.metrics import generate_backtest_output
-import importlib.machinery, importlib.util
-import calendar, datetime as dt, psycopg2, pandas as pd
+from applications import (bars_sql, datasource, fastcsv, manifest, memo,
+                          perf, profiler, registry, resample, resultio)
+import calendar, datetime as dt, os, pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 
 # ── paths ───────────────────────────────────────────────────────────
@@ -29,105 +36,321 @@ DATA_ROOT   = ROOT / "data"            # CSV cache lives here
 
 # ── Postgres info (fallback when CSV not cached) ────────────────────
 PG_DSN    = "dbname=forex_data user=tradeops"
+# backend for cache misses; --source / $FOREX_SOURCE, e.g. duckdb:data/forex.duckdb
+SOURCE    = datasource.open_source(os.environ.get("FOREX_SOURCE") or PG_DSN)
 TABLE_MAP = {"M1": "forex_rates_1m", "tick": "forex_quotes_raw"}
+TF_CHOICES = [*TABLE_MAP, *resample.TF_MINUTES]   # M5…H4 built from M1
 
 # ── helper: make timestamp column tz-aware UTC ──────────────────────
 def _ensure_utc(df: pd.DataFrame) -> pd.DataFrame:
+    if df["timestamp_utc"].dtype == object:     # mixed precision, e.g. COPY'd ticks
+        df["timestamp_utc"] = pd.to_datetime(df["timestamp_utc"], utc=True,
+                                             format="ISO8601")
     if df["timestamp_utc"].dt.tz is None:
         df["timestamp_utc"] = df["timestamp_utc"].dt.tz_localize("UTC")
     return df
 
-# ── CSV-or-DB loader, glues months together ─────────────────────────
-def load_bars(symbol: str, start: str, end: str,
-              tf: str = "M1", cache_csv: bool = True) -> pd.DataFrame:
+def _empty_ticks() -> pd.DataFrame:
+    """What read_month gives for a header-only tick month."""
+    return pd.DataFrame({"timestamp_utc": pd.Series(dtype="datetime64[ns, UTC]"),
+                         "bid_price": pd.Series(dtype="float64"),
+                         "ask_price": pd.Series(dtype="float64")})
+
+# ── cache reads tagged with the integrity manifest's verdict ─────────
+def _read_cache(fp: Path) -> pd.DataFrame:
+    df = fastcsv.read_month(fp)              # typed, epoch-parsed timestamps
+    if manifest.is_trusted(fp):
+        df.attrs["trusted"] = True
+    return df
+
+def _trust(df: pd.DataFrame, entry: dict) -> None:
+    if entry["trusted"]:
+        df.attrs["trusted"] = True
+
+# ── one calendar month: CSV cache, else Postgres (M1 / tick) ────────
+def _load_month(symbol: str, per: pd.Period, tf: str,
+                cache_csv: bool, push: dict | None = None) -> pd.DataFrame:
+    """`push` (see iter_bars) narrows a DB miss to the rows actually
+    needed; such partial months are returned but never cached."""
+    ym, yr, mo = per.strftime("%Y-%m"), per.year, per.month
+    fp_csv = DATA_ROOT / symbol / tf / f"{ym}.csv"
+    t0     = time.perf_counter()
+
+    def _done(df, source, **extra):
+        perf.count(f"months_{source}")
+        perf.event("month", month=ym, tf=tf, source=source, rows=len(df),
+                   secs=round(time.perf_counter() - t0, 4), **extra)
+        return df
+
+    # higher TFs are derived from the M1 month, never fetched
+    if tf in resample.TF_MINUTES:
+        src = DATA_ROOT / symbol / "M1" / f"{ym}.csv"
+        if resample.is_fresh(fp_csv, src):
+            return _done(_read_cache(fp_csv), "cache")
+        if push is not None and not src.is_file():       # bucket in SQL
+            return _fetch_push(symbol, per, "M1", {**push, "bucket": tf}, _done)
+        m1     = _load_month(symbol, per, "M1", cache_csv)
+        frames = resample.resample_ohlc(m1)
+        if cache_csv and src.is_file():
+            resample.write_derived(frames, DATA_ROOT / symbol, ym, src)
+            for t, f in frames.items():
+                manifest.record(DATA_ROOT / symbol / t / f"{ym}.csv", t, f)
+        if m1.attrs.get("trusted"):           # sorted + unique in → same out
+            frames[tf].attrs["trusted"] = True
+        return _done(frames[tf], "resample")
+
+    # 1) CSV cache?
+    if fp_csv.is_file():
+        return _done(_read_cache(fp_csv), "cache")
+
+    # 2) fallback to SOURCE – Postgres or DuckDB (only the needed rows with pushdown)
+    if push is not None:
+        return _fetch_push(symbol, per, tf, push, _done)
+    first = dt.datetime(yr, mo, 1, tzinfo=dt.timezone.utc)
+    last  = dt.datetime(yr, mo, calendar.monthrange(yr, mo)[1], 23, 59, 59,
+                        999999, tzinfo=dt.timezone.utc)
+    tbl   = TABLE_MAP.get(tf, f"forex_rates_{tf.lower()}")
+    cols  = ("timestamp_utc, open, high, low, close"
+             if tf == "M1" else
+             "timestamp_utc, bid_price, ask_price")
+    sql   = f"""
+        SELECT {cols}
+        FROM   {tbl}
+        WHERE  symbol = %s
+          AND  timestamp_utc BETWEEN %s AND %s
+        ORDER  BY timestamp_utc
+    """
+    params = [symbol, first, last]
+    if tf == "tick":
+        # quotes: COPY straight into the cache (or server-side cursor
+        # batches) – the month never exists as tuples + frame + CSV string
+        if cache_csv:
+            n    = SOURCE.copy_to_csv(sql, params, fp_csv)
+            db_s = round(time.perf_counter() - t0, 4)
+            if not n:                        # nothing written, nothing cached
+                return _done(_empty_ticks(), "db", db_s=db_s)
+            df   = fastcsv.read_month(fp_csv)
+            _trust(df, manifest.record(fp_csv, tf, df))
+        else:
+            df   = _ensure_utc(pd.concat(SOURCE.iter_batches(sql, params),
+                                         ignore_index=True))
+            db_s = round(time.perf_counter() - t0, 4)
+        return _done(df, "db", db_s=db_s)
+
+    df   = _ensure_utc(SOURCE.read(sql, params))
+    db_s = round(time.perf_counter() - t0, 4)
+    if cache_csv:
+        fp_csv.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(fp_csv, index=False,
+                  date_format="%Y-%m-%dT%H:%M:%SZ")
+        _trust(df, manifest.record(fp_csv, tf, df))
+    return _done(df, "db", db_s=db_s)
+
+# ── DB pushdown: bounds / session / bucketing in SQL, never cached ──
+def _fetch_push(symbol: str, per: pd.Period, tf: str, push: dict,
+                done) -> pd.DataFrame:
+    first = per.start_time.tz_localize("UTC")
+    lo    = max(first, push["start"]).to_pydatetime()
+    hi    = min(first + pd.offsets.MonthBegin(1) - pd.Timedelta(1, "us"),
+                push["end"]).to_pydatetime()
+    sql, params = bars_sql.bars_query(symbol, lo, hi, tf,
+                                      session=push.get("session"),
+                                      bucket=push.get("bucket"))
+    t0 = time.perf_counter()
+    if tf == "tick" and not push.get("bucket"):
+        df = _ensure_utc(pd.concat(SOURCE.iter_batches(sql, params),
+                                   ignore_index=True))
+    else:
+        df = _ensure_utc(SOURCE.read(sql, params))
+    return done(df, "db_push", db_s=round(time.perf_counter() - t0, 4))
+
+# ── streaming loader: month frames with read-ahead ──────────────────
+def iter_bars(symbol: str, start: str, end: str, tf: str = "M1",
+              cache_csv: bool = True, prefetch: int = 1,
+              session: tuple | None = None, pushdown: bool = False,
+              bucket: str | None = None):
+    """
+    Yield one indexed, range-trimmed frame per calendar month.  Up to
+    `prefetch` months are loaded ahead in background threads, so the
+    CSV/DB read of month N+1 overlaps whatever the consumer does with N.
+
+    session=("07:00","17:00") keeps London-time bars only (DST-aware);
+    bucket="M1"… turns tf="tick" rows into mid-price OHLC bars.
+    pushdown=True sends the window, the --from/--to bounds and the
+    M5…H4 / tick bucketing to Postgres on a cache miss
+    (applications/bars_sql.py); cached months get the same treatment
+    client-side, so both paths return the same frames.  start / end
+    select bar labels: a bucketed bar is always the whole bucket.
+    """
     start = pd.to_datetime(start, utc=True)
     end   = pd.to_datetime(end,   utc=True)
-    frames = []
-    for per in pd.period_range(start, end, freq="M"):
-        ym, yr, mo = per.strftime("%Y-%m"), per.year, per.month
-        # 1) CSV cache?
-        fp_csv = DATA_ROOT / symbol / tf / f"{ym}.csv"
-        if fp_csv.is_file():
-            df = _ensure_utc(pd.read_csv(fp_csv, parse_dates=["timestamp_utc"]))
-        else:
-            # 2) fallback to Postgres
-            first = dt.datetime(yr, mo, 1, tzinfo=dt.timezone.utc)
-            last  = dt.datetime(yr, mo, calendar.monthrange(yr, mo)[1], 23, 59,
-                                tzinfo=dt.timezone.utc)
-            tbl   = TABLE_MAP.get(tf, f"forex_rates_{tf.lower()}")
-            cols  = ("timestamp_utc, open, high, low, close"
-                     if tf == "M1" else
-                     "timestamp_utc, bid_price, ask_price")
-            sql   = f"""
-                SELECT {cols}
-                FROM   {tbl}
-                WHERE  symbol = %s
-                  AND  timestamp_utc BETWEEN %s AND %s
-                ORDER  BY timestamp_utc
-            """
-            with psycopg2.connect(PG_DSN) as con:
-                df = _ensure_utc(pd.read_sql(sql, con, params=[symbol, first, last]))
-            if cache_csv:
-                fp_csv.parent.mkdir(parents=True, exist_ok=True)
-                df.to_csv(fp_csv, index=False,
-                          date_format="%Y-%m-%dT%H:%M:%SZ")
-        frames.append(df)
-    df = pd.concat(frames, ignore_index=True)
-    df = df[(df.timestamp_utc >= start) & (df.timestamp_utc <= end)]
-    return df.set_index("timestamp_utc")
-
-# ── dynamic import of engine.py (handles “001/v6.02”) ───────────────
+    push  = ({"start": start, "end": end, "session": session, "bucket": bucket}
+             if pushdown else None)
+
+    def _one(per):
+        df = _load_month(symbol, per, tf, cache_csv, push)
+        if bucket and "bid_price" in df:            # raw ticks from the cache:
+            df = bars_sql.bucket_ticks(df, bucket)  # whole buckets, then trim
+        df = df[(df.timestamp_utc >= start) & (df.timestamp_utc <= end)]
+        if session is not None:
+            df = df[bars_sql.in_session(df.timestamp_utc, session)]
+        return df.set_index("timestamp_utc")
+
+    months = iter(pd.period_range(start, end, freq="M"))
+    pool   = ThreadPoolExecutor(max_workers=max(1, prefetch))
+    try:
+        ahead = deque(pool.submit(_one, per)
+                      for per in islice(months, prefetch + 1))
+        while ahead:
+            df = ahead.popleft().result()
+            for per in islice(months, 1):
+                ahead.append(pool.submit(_one, per))
+            yield df
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+# ── CSV-or-DB loader, glues months together ─────────────────────────
+def load_bars(symbol: str, start: str, end: str,
+              tf: str = "M1", cache_csv: bool = True, **push) -> pd.DataFrame:
+    return pd.concat(iter_bars(symbol, start, end, tf, cache_csv, **push))
+
+# ── engine import via the registry (dir/engine.py or any module) ────
 def load_engine(engine_path: str):
-    eng_file = (ENGINE_ROOT / engine_path / "engine.py").resolve()
-    if not eng_file.is_file():
-        raise FileNotFoundError(f"Engine file not found: {eng_file}")
-    loader = importlib.machinery.SourceFileLoader("engine_mod", str(eng_file))
-    spec   = importlib.util.spec_from_loader(loader.name, loader)
-    eng_mod= importlib.util.module_from_spec(spec)
-    loader.exec_module(eng_mod)
-    return eng_mod
+    return registry.load(engine_path)
+
+# ── --params: JSON blob or key1=val1,key2=val2 ──────────────────────
+def parse_params(txt: str | None) -> dict:
+    if not txt:
+        return {}
+    if txt.strip().startswith("{"):
+        return json.loads(txt)
+    kv = [s.split("=", 1) for s in txt.split(",")]
+    return {k: (float(v) if "." in v else int(v)) for k, v in kv}
+
+# ── result bundle → <results>/<UTC-timestamp>.txt ──────────────────
+def write_result(res_dir: Path, results: dict, gz: bool = False) -> Path:
+    res_dir.mkdir(parents=True, exist_ok=True)
+    stamp    = datetime.datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
+    out_path = res_dir / (f"{stamp}.json.gz" if gz else f"{stamp}.txt")
+    return resultio.write(out_path, results)
 
 # ────────────────────────────────────────────────────────────────────
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--engine", required=True, help="e.g. 001/v6.02")
+    ap.add_argument("--engine", required=True,
+                    help="registry id, e.g. 001/v6.02 or 001/v6.0/engines/mr_v6_0")
     ap.add_argument("--from", dest="start", required=True)
     ap.add_argument("--to",   dest="end",   required=True)
     ap.add_argument("--symbol", default="EURGBP")
-    ap.add_argument("--tf",     choices=["M1", "tick"], default="M1")
+    ap.add_argument("--tf",     choices=TF_CHOICES, default="M1",
+                    help="M5…H4 are resampled from the cached M1 months")
     ap.add_argument("--params", type=str,
                     help='JSON blob or key1=val1,key2=val2 overrides')
+    ap.add_argument("--session", type=bars_sql.parse_session,
+                    help="London-time bar window, e.g. 07:00-17:00")
+    ap.add_argument("--pushdown", action="store_true",
+                    help="on a cache miss let Postgres apply --session, "
+                         "--from/--to and resampling (rows not cached)")
+    ap.add_argument("--bucket", choices=list(resample.ALL_MINUTES),
+                    help="with --tf tick: mid-price OHLC bars of this size")
+    ap.add_argument("--force", action="store_true",
+                    help="re-run even if an identical run is memoised")
+    ap.add_argument("--stream", action="store_true",
+                    help="feed month frames to a stream-capable engine "
+                         "while the next month loads (always runs the "
+                         "engine; the memo only saves the bundle build)")
+    ap.add_argument("--exposure", action="store_true",
+                    help="set cfg['exposure']: per-bar open tickets / net "
+                         "exposure / MTM pips in the bundle (exposure.py)")
+    ap.add_argument("--no-perf", dest="perf", action="store_false",
+                    help="leave the perf section (phase times, counters, "
+                         "per-month events) out of the bundle")
+    ap.add_argument("--gzip", action="store_true",
+                    help="write <stamp>.json.gz instead of <stamp>.txt")
+    ap.add_argument("--profile", action="store_true",
+                    help="sample stacks + tracemalloc per phase (implies --force); "
+                         "writes <stamp>.collapsed and <stamp>.top.txt")
+    ap.add_argument("--profile-interval", type=float, default=1.0,
+                    help="sampling interval in ms (default 1)")
+    ap.add_argument("--source",
+                    help="cache-miss backend: Postgres DSN or duckdb:<file> "
+                         "(default $FOREX_SOURCE, else PG_DSN)")
     args = ap.parse_args()
+    if args.source:
+        global SOURCE
+        SOURCE = datasource.open_source(args.source)
+    if args.profile:
+        args.force = args.perf = True
+        tracemalloc.start()
+        prof = profiler.Sampler(args.profile_interval / 1e3).start()
+    if args.perf:
+        perf.start()
 
-    # 1) load engine & bars
-    engine = load_engine(args.engine)
-    bars   = load_bars(args.symbol, args.start, args.end, tf=args.tf)
+    # 1) load engine
+    with perf.phase("engine_load"):
+        engine = load_engine(args.engine)
+    stream = args.stream and "stream" in engine.ENGINE_SPEC.capabilities
 
     # 2) merge CFG + CLI overrides
-    overrides = {}
-    if args.params:
-        if args.params.strip().startswith("{"):
-            overrides = json.loads(args.params)
-        else:
-            kv = [s.split("=", 1) for s in args.params.split(",")]
-            overrides = {k: (float(v) if "." in v else int(v)) for k, v in kv}
-    cfg = {**getattr(engine, "CFG", {}), **overrides}
+    cfg = {**registry.default_cfg(engine), **parse_params(args.params)}
+    if args.exposure:
+        cfg["exposure"] = True
 
-    # 3) run back-test
-    trade_log, equity = engine.run_backtest(bars, cfg)
+    res_dir = engine.ENGINE_SPEC.root / "results"
+    feed = {"session": args.session, "pushdown": args.pushdown,
+            "bucket": args.bucket if args.tf == "tick" else None}
+    if stream:
+        # 3) run back-test on the month stream.  The memo key needs the bars
+        # hash, which a stream only has once every month went through the
+        # engine – looking it up first would read the range twice (or hold
+        # it), which is what --stream avoids.  So the engine always runs;
+        # an existing bundle for the same key is reused instead of rebuilt.
+        bars_fp = memo.BarsHash()
+        frames  = bars_fp.tap(iter_bars(args.symbol, args.start, args.end,
+                                        tf=args.tf, **feed))
+        with perf.phase("engine"):
+            trade_log, equity = registry.run_stream(engine, frames, cfg)
+        key = memo.run_key(engine.__file__, bars_fp.hexdigest(), cfg)
+        hit = None if args.force else memo.lookup(res_dir, key)
+        if hit is not None:
+            perf.stop()
+            print("JSON:", hit.relative_to(ENGINE_ROOT))
+            return 0
+    else:
+        # 2b) identical engine source + bars + cfg already run? reuse it
+        with perf.phase("load_bars"):
+            bars = load_bars(args.symbol, args.start, args.end, tf=args.tf,
+                             **feed)
+        key  = memo.run_key(engine.__file__, memo.bars_fingerprint(bars), cfg)
+        hit  = None if args.force else memo.lookup(res_dir, key)
+        if hit is not None:
+            perf.stop()
+            print("JSON:", hit.relative_to(ENGINE_ROOT))
+            return 0
 
-    # 4) build pretty JSON result bundle
-    results = generate_backtest_output(
-                 trade_log, equity, cfg, engine_file=args.engine)
+        # 3) run back-test
+        with perf.phase("engine"):
+            trade_log, equity = registry.run(engine, bars, cfg)
 
-    res_dir  = ENGINE_ROOT / args.engine / "results"
-    res_dir.mkdir(parents=True, exist_ok=True)
-    stamp    = datetime.datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
-    out_path = res_dir / f"{stamp}.txt"
-    out_path.write_text(json.dumps(results, indent=2, default=str))
+    # 4) build JSON result bundle (+ perf, everything but the write)
+    with perf.phase("metrics"):
+        results = generate_backtest_output(
+                     trade_log, equity, cfg, engine_file=args.engine)
+    if args.profile:
+        results["profile"] = prof.stop().summary()
+    if args.perf:
+        results["perf"] = perf.stop()
+    if args.profile:
+        tracemalloc.stop()
+
+    out_path = write_result(res_dir, results, gz=args.gzip)
+    memo.store(res_dir, key, out_path)
 
     # echo path for /kick_bt
     print("JSON:", out_path.relative_to(ENGINE_ROOT))
+    if args.profile:
+        for fp in prof.write(out_path):
+            print("PROFILE:", fp.relative_to(ENGINE_ROOT))
     return 0
 
 # ────────────────────────────────────────────────────────────────────
@@ -0,0 +1,123 @@
+"""
+bars_sql.py – Postgres query builder with session / range / TF pushdown
+-----------------------------------------------------------------------
+    sql, params = bars_query("EURGBP", lo, hi, tf="M1",
+                             session=("07:00", "17:00"), bucket="M5")
+
+Instead of pulling a whole calendar month and trimming in pandas, the
+WHERE clause carries
+    • the exact [lo, hi] bounds (inclusive, like iter_bars' trim); once
+      bucketed they select bar labels and every bar is a whole bucket,
+      exactly like the cache path (full month resampled, labels trimmed)
+    • an optional session window in SESSION_TZ wall-clock time, so
+      07:00–17:00 London follows BST/GMT without the caller converting;
+      like the engines' between_time it tests the bar timestamp (the
+      bucket start once bucketed), inclusive at both ends; an overnight
+      window (22:00–06:00) becomes t >= open OR t <= close
+    • for bucket=M5…H4 (or M1 from ticks) an epoch-aligned GROUP BY with
+      first/last-by-time open/close – the same left-labelled buckets as
+      resample.resample_ohlc, so both paths yield identical bars
+
+Ticks (tf="tick") are bucketed on the bid/ask mid; without a bucket
+they come back raw.  Rows fetched this way are a slice of the month,
+so callers must never write them into the month CSV cache.
+
+The connection is expected to run with TimeZone=UTC (see PG_OPTIONS):
+`timestamp_utc::timestamptz` is then correct whether the column is
+timestamptz or a naive UTC timestamp.
+"""
+
+from __future__ import annotations
+from typing import Tuple
+
+import pandas as pd
+
+from applications import resample
+
+SESSION_TZ = "Europe/London"
+PG_OPTIONS = "-c timezone=UTC"
+TABLES     = {"M1": "forex_rates_1m", "tick": "forex_quotes_raw"}
+
+
+def parse_session(txt: str | None) -> Tuple[str, str] | None:
+    """'07:00-17:00' → ('07:00', '17:00')."""
+    if not txt:
+        return None
+    a, b = txt.split("-", 1)
+    return a.strip(), b.strip()
+
+
+def in_session(ts: pd.Series, session: Tuple[str, str],
+               tz: str = SESSION_TZ) -> pd.Series:
+    """Client-side twin of the SQL session clause (bool mask, inclusive)."""
+    from applications.sessions import calendar       # sessions imports us
+    return pd.Series(calendar(pd.DatetimeIndex(ts), session, tz).mask,
+                     index=ts.index)
+
+
+def bucket_ticks(ticks: pd.DataFrame, bucket: str) -> pd.DataFrame:
+    """Cached raw ticks → mid-price OHLC bars, same buckets as the SQL."""
+    mid = (ticks["bid_price"] + ticks["ask_price"]).to_numpy(float) / 2
+    m1  = pd.DataFrame({"timestamp_utc": ticks["timestamp_utc"],
+                        "open": mid, "high": mid, "low": mid, "close": mid})
+    return resample.resample_ohlc(m1, [bucket])[bucket]
+
+
+def _in_session(expr: str, session: Tuple[str, str]) -> Tuple[str, list]:
+    """SQL twin of sessions.calendar's mask (inclusive, overnight-aware)."""
+    o, c  = session
+    local = f"({expr} AT TIME ZONE %s)::time"
+    if pd.Timestamp(o) <= pd.Timestamp(c):
+        return f"{local} BETWEEN %s AND %s", [SESSION_TZ, o, c]
+    return f"({local} >= %s OR {local} <= %s)", [SESSION_TZ, o, SESSION_TZ, c]
+
+
+def bars_query(symbol: str, lo, hi, tf: str = "M1",
+               session: Tuple[str, str] | None = None,
+               bucket: str | None = None) -> Tuple[str, list]:
+    tbl    = TABLES.get(tf, f"forex_rates_{tf.lower()}")
+    ts     = "timestamp_utc::timestamptz"
+
+    if tf == "tick":
+        o = h = l = c = "(bid_price + ask_price) / 2"
+        raw = "timestamp_utc, bid_price, ask_price"
+    else:
+        o, h, l, c = "open", "high", "low", "close"
+        raw = "timestamp_utc, open, high, low, close"
+
+    if bucket is None:
+        cond, params = f"symbol = %s\n          AND  {ts} BETWEEN %s AND %s", [symbol, lo, hi]
+        if session is not None:
+            sql, p = _in_session(ts, session)
+            cond, params = cond + "\n          AND  " + sql, params + p
+        return f"""
+        SELECT {raw}
+        FROM   {tbl}
+        WHERE  {cond}
+        ORDER  BY timestamp_utc
+    """, params
+
+    # whole buckets in, [lo, hi] applied to the label – like the cache path,
+    # which buckets the full month and then trims bar labels
+    w     = resample.ALL_MINUTES[bucket] * 60
+    first = pd.Timestamp(lo).floor(f"{w}s")
+    end   = pd.Timestamp(hi).floor(f"{w}s") + pd.Timedelta(seconds=w)
+    label = f"to_timestamp(floor(extract(epoch FROM {ts}) / {w}) * {w})"
+    params = [symbol, first.to_pydatetime(), end.to_pydatetime(), lo, hi]
+    having = f"{label} BETWEEN %s AND %s"
+    if session is not None:
+        sql, p = _in_session(label, session)
+        having, params = having + "\n           AND " + sql, params + p
+    return f"""
+        SELECT {label} AS timestamp_utc,
+               (array_agg({o} ORDER BY {ts}))[1]      AS open,
+               max({h})                               AS high,
+               min({l})                               AS low,
+               (array_agg({c} ORDER BY {ts} DESC))[1] AS close
+        FROM   {tbl}
+        WHERE  symbol = %s
+          AND  {ts} >= %s AND {ts} < %s
+        GROUP  BY 1
+        HAVING {having}
+        ORDER  BY 1
+    """, params
@@ -0,0 +1,290 @@
+"""
+bench.py – throughput / memory benchmark for every engine version
+-----------------------------------------------------------------
+CLI examples:
+    python applications/bench.py run                       # defaults below
+    python applications/bench.py run --engines 001/v6.02 --data synth:3
+    python applications/bench.py run --repeat 9 --warmup 2
+    python applications/bench.py compare --threshold 0.10
+
+`run` times each engine × dataset in a fresh subprocess (so peak RSS is
+per case) through the phases
+    load · engine · png · metrics · write
+`load` runs once; the rest run --warmup untimed passes, then --repeat
+timed ones.  Every pass starts with the indicator / calendar memos
+cleared, so `engine` always includes the engine's own indicator work
+(engines that memo-hit and engines that copy the frame pay alike);
+engines reporting perf phases also get `indicators` split out of it.
+`write` goes through resultio like the wrapper.  One JSON line per case
+is appended to bench/history.jsonl:
+    {run, sha, engine, data, bars, trades, repeat, phases{min s},
+     phases_median{…}, bars_per_s, trades_per_s, peak_rss_mb}
+
+Datasets:
+    mar2025     001/v5.0/forex_1m_Mar_2025_EURGBP.csv
+    synth:<N>   N years of seeded random-walk Mon–Fri minute bars
+
+`compare` sets the latest run against the previous one (or --base) per
+engine × dataset on the per-phase minimum and flags slower engine runs,
+lower bars/s or higher peak RSS beyond --threshold – for timings, beyond
+--threshold plus the median/min spread either run saw; exit code 1 when
+anything regressed.  Records from before --repeat are skipped.
+"""
+
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse, json, datetime, resource, subprocess, tempfile, time
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+HISTORY  = ROOT / "bench" / "history.jsonl"
+MAR_CSV  = ROOT / "001" / "v5.0" / "forex_1m_Mar_2025_EURGBP.csv"
+ENGINES  = ["mr_engine", "templates/mr_core", "001/v6.02",
+            "001/v6.0/engines/mr_v6_0", "001/v5.0/engines/mr_v5_0"]
+DATASETS = ["mar2025", "synth:2"]
+REPEAT   = 5
+WARMUP   = 1
+
+
+# ── data ────────────────────────────────────────────────────────────
+def synth_bars(years: float, seed: int = 7) -> pd.DataFrame:
+    """Seeded EURGBP-like random walk, Mon–Fri minute bars from 2020."""
+    idx = pd.date_range("2020-01-01", periods=int(years * 365 * 1440),
+                        freq="min", tz="UTC")
+    idx = idx[idx.dayofweek < 5]
+    rng = np.random.default_rng(seed)
+    close = 0.85 + np.cumsum(rng.normal(0, 1.5e-4, len(idx)))
+    open_ = np.r_[close[0], close[:-1]]
+    wick  = np.abs(rng.normal(0, 5e-5, (2, len(idx))))
+    return pd.DataFrame({"timestamp_utc": idx,
+                         "open": open_.round(5),
+                         "high": (np.maximum(open_, close) + wick[0]).round(5),
+                         "low":  (np.minimum(open_, close) - wick[1]).round(5),
+                         "close": close.round(5)})
+
+
+def dataset_csv(name: str, tmp: pathlib.Path) -> pathlib.Path:
+    if name == "mar2025":
+        return MAR_CSV
+    if name.startswith("synth:"):
+        fp = tmp / f"{name.replace(':', '_')}.csv"
+        if not fp.is_file():
+            synth_bars(float(name.split(":", 1)[1])).to_csv(
+                fp, index=False, date_format="%Y-%m-%dT%H:%M:%SZ")
+        return fp
+    raise ValueError(f"unknown dataset: {name}")
+
+
+# ── one case (runs inside its own interpreter) ──────────────────────
+def _cold() -> None:
+    """Forget memoised indicators / calendars so every pass pays for them."""
+    from applications import indicators, sessions
+    indicators._MEMO.clear()
+    sessions._MEMO.clear()
+
+
+def run_case(engine_id: str, csv: pathlib.Path, repeat: int = REPEAT,
+             warmup: int = WARMUP) -> dict:
+    from applications import metrics, perf, registry, resultio
+
+    t = time.perf_counter()
+    bars = pd.read_csv(csv, parse_dates=["timestamp_utc"],
+                       usecols=["timestamp_utc", "open", "high", "low", "close"])
+    bars = bars.set_index("timestamp_utc")
+    load = time.perf_counter() - t
+
+    engine = registry.load(engine_id)
+    cfg    = registry.default_cfg(engine)
+    render = metrics._png_from_equity
+    runs   = []
+    with tempfile.TemporaryDirectory() as tmp:
+        out = pathlib.Path(tmp) / "bench.txt"
+        for i in range(warmup + max(repeat, 1)):
+            ph = {}
+            _cold()
+            perf.start()
+            t = time.perf_counter()
+            trade_log, equity = registry.run(engine, bars, cfg)
+            ph["engine"] = time.perf_counter() - t
+            ind = (perf.stop() or {}).get("phases_s", {}).get("indicators")
+            if ind is not None:                  # engines that report the split
+                ph["indicators"] = ind
+
+            t = time.perf_counter()
+            png = render(equity)
+            ph["png"] = time.perf_counter() - t
+
+            # stats only – hand the bundle the PNG rendered above
+            metrics._png_from_equity = lambda eq: png
+            try:
+                t = time.perf_counter()
+                results = metrics.generate_backtest_output(trade_log, equity, cfg,
+                                                           engine_id)
+                ph["metrics"] = time.perf_counter() - t
+            finally:
+                metrics._png_from_equity = render
+
+            t = time.perf_counter()
+            resultio.write(out, results)
+            ph["write"] = time.perf_counter() - t
+            if i >= warmup:
+                runs.append(ph)
+
+    def stat(fn):
+        return {"load": round(load, 4),
+                **{p: round(float(fn([r[p] for r in runs])), 4) for p in runs[0]}}
+
+    best = stat(np.min)
+    n, k = len(bars), len(trade_log)
+    return {
+        "engine": engine_id,
+        "bars": n,
+        "trades": k,
+        "repeat": len(runs),
+        "phases": best,
+        "phases_median": stat(np.median),
+        "bars_per_s": round(n / best["engine"], 1) if best["engine"] else None,
+        "trades_per_s": round(k / best["engine"], 1) if best["engine"] else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF)
+                             .ru_maxrss / 1024, 1),      # Linux: KiB
+    }
+
+
+# ── run / compare ───────────────────────────────────────────────────
+def _git_sha() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_run(args) -> int:
+    run_id = datetime.datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
+    sha    = _git_sha()
+    HISTORY.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for data in args.data.split(","):
+            csv = dataset_csv(data, pathlib.Path(tmp))
+            for engine_id in args.engines.split(","):
+                proc = subprocess.run(
+                    [sys.executable, __file__, "_case",
+                     "--engine", engine_id, "--csv", str(csv),
+                     "--repeat", str(args.repeat), "--warmup", str(args.warmup)],
+                    capture_output=True, text=True, cwd=ROOT)
+                if proc.returncode != 0:
+                    tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+                    rec = {"engine": engine_id, "error": tail[0]}
+                else:
+                    rec = json.loads(proc.stdout.strip().splitlines()[-1])
+                rec = {"run": run_id, "sha": sha, "data": data, **rec}
+                with HISTORY.open("a") as fh:
+                    fh.write(json.dumps(rec) + "\n")
+                _print_rec(rec)
+    print("HISTORY:", HISTORY.relative_to(ROOT), "run", run_id)
+    return 0
+
+
+def _print_rec(r: dict) -> None:
+    if "error" in r:
+        print(f"{r['engine']:<28} {r['data']:<9} ERROR {r['error']}")
+        return
+    ph = " ".join(f"{k}={v:.3f}" for k, v in r["phases"].items())
+    print(f"{r['engine']:<28} {r['data']:<9} bars/s={r['bars_per_s']:>10,.0f} "
+          f"trades/s={r['trades_per_s']:>8,.1f} rss={r['peak_rss_mb']:>7.1f}MB  {ph}")
+
+
+def load_history() -> list:
+    if not HISTORY.is_file():
+        return []
+    return [json.loads(l) for l in HISTORY.read_text().splitlines() if l.strip()]
+
+
+def spread(r: dict) -> float:
+    """Run-to-run jitter of a case: median / min − 1 of its engine time."""
+    lo = r["phases"]["engine"]
+    return r["phases_median"]["engine"] / lo - 1 if lo else 0.0
+
+
+def regressions(base: dict, head: dict, threshold: float) -> list:
+    """Human-readable list of metrics that got worse by > threshold; timings
+    must also move by more than the jitter either side measured."""
+    out   = []
+    noise = max(spread(base), spread(head))
+    checks = [("engine s",   base["phases"]["engine"], head["phases"]["engine"], +1, noise),
+              ("total s",    sum(base["phases"].values()),
+                             sum(head["phases"].values()),                      +1, noise),
+              ("bars/s",     base["bars_per_s"],      head["bars_per_s"],      -1, noise),
+              ("peak RSS MB", base["peak_rss_mb"],    head["peak_rss_mb"],     +1, 0.0)]
+    for name, b, h, worse, jitter in checks:
+        if not b or h is None:
+            continue
+        change = (h - b) / b
+        if change * worse > threshold + jitter:
+            out.append(f"{name} {b:g} → {h:g} ({change:+.1%}, jitter {jitter:.1%})")
+    return out
+
+
+def cmd_compare(args) -> int:
+    hist = [r for r in load_history() if "error" not in r and "repeat" in r]
+    runs = sorted({r["run"] for r in hist})
+    if len(runs) < 2 and not args.base:
+        print("need at least two runs in", HISTORY.relative_to(ROOT))
+        return 0
+    head_id = args.head or runs[-1]
+    base_id = args.base or max(r for r in runs if r < head_id)
+    base = {(r["engine"], r["data"]): r for r in hist if r["run"] == base_id}
+    head = {(r["engine"], r["data"]): r for r in hist if r["run"] == head_id}
+
+    print(f"base {base_id} ({base and next(iter(base.values()))['sha']})  →  "
+          f"head {head_id} ({head and next(iter(head.values()))['sha']})")
+    bad = 0
+    for key in sorted(head):
+        if key not in base:
+            continue
+        worse = regressions(base[key], head[key], args.threshold)
+        flag  = "REGRESSION" if worse else "ok"
+        bad  += bool(worse)
+        b, h  = base[key]["bars_per_s"], head[key]["bars_per_s"]
+        print(f"{key[0]:<28} {key[1]:<9} bars/s {b:>10,.0f} → {h:>10,.0f}  {flag}"
+              + ("  " + "; ".join(worse) if worse else ""))
+    return 1 if bad else 0
+
+
+# ────────────────────────────────────────────────────────────────────
+def main():
+    ap  = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run")
+    r.add_argument("--engines", default=",".join(ENGINES))
+    r.add_argument("--data",    default=",".join(DATASETS))
+    r.add_argument("--repeat",  type=int, default=REPEAT,
+                   help="timed passes per case; phases keep the minimum")
+    r.add_argument("--warmup",  type=int, default=WARMUP,
+                   help="untimed passes first (imports, numba compile)")
+
+    c = sub.add_parser("compare")
+    c.add_argument("--base", help="run id (default: run before --head)")
+    c.add_argument("--head", help="run id (default: latest)")
+    c.add_argument("--threshold", type=float, default=0.10)
+
+    k = sub.add_parser("_case")                  # internal: one subprocess
+    k.add_argument("--engine", required=True)
+    k.add_argument("--csv",    required=True)
+    k.add_argument("--repeat", type=int, default=REPEAT)
+    k.add_argument("--warmup", type=int, default=WARMUP)
+
+    args = ap.parse_args()
+    if args.cmd == "_case":
+        print(json.dumps(run_case(args.engine, pathlib.Path(args.csv),
+                                    args.repeat, args.warmup)))
+        return 0
+    return cmd_run(args) if args.cmd == "run" else cmd_compare(args)
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+datasource.py – where cache misses are served from: Postgres or DuckDB
+---------------------------------------------------------------------
+    src = open_source("postgres:dbname=forex_data user=tradeops")
+    src = open_source("duckdb:data/forex.duckdb")      # offline / CI
+    df  = src.read(sql, params)                   # %s placeholders
+    src.copy_to_csv(sql, params, fp)              # streamed, returns rows (0: fp untouched)
+    for chunk in src.iter_batches(sql, params): …
+
+Both backends serve the same tables (TABLE_MAP names in
+backtest_wrapper) and the same SQL built there and in bars_sql –
+`SELECT … WHERE symbol = %s AND timestamp_utc BETWEEN %s AND %s`,
+session clause, epoch bucketing – so Postgres is just one backend.
+The DuckDB file keeps every table sorted on (symbol, timestamp_utc),
+so those range predicates are served from the min/max zone maps
+without a full scan.
+
+Build / extend a DuckDB file from the CSV cache or any month CSV:
+    python applications/datasource.py load --db data/forex.duckdb \
+           --symbol EURGBP --tf M1                    # <DATA_ROOT>/EURGBP/M1/*.csv
+    python applications/datasource.py load --db data/forex.duckdb \
+           --symbol EURGBP --tf M1 001/v5.0/forex_1m_Mar_2025_EURGBP.csv
+
+psycopg2 / duckdb are imported only by the backend that needs them.
+"""
+
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import os, threading
+from pathlib import Path
+import pandas as pd
+
+from applications.bars_sql import PG_OPTIONS
+
+DATA_ROOT = ROOT / "data"
+TABLES = {
+    "forex_rates_1m":   ("timestamp_utc TIMESTAMPTZ, open DOUBLE, high DOUBLE, "
+                         "low DOUBLE, close DOUBLE"),
+    "forex_quotes_raw": "timestamp_utc TIMESTAMPTZ, bid_price DOUBLE, ask_price DOUBLE",
+}
+TF_TABLE = {"M1": "forex_rates_1m", "tick": "forex_quotes_raw"}
+
+
+# ── backends ────────────────────────────────────────────────────────
+class PostgresSource:
+    kind = "postgres"
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+
+    def read(self, sql: str, params: list) -> pd.DataFrame:
+        import psycopg2
+        with psycopg2.connect(self.dsn, options=PG_OPTIONS) as con:
+            return pd.read_sql(sql, con, params=params)
+
+    def iter_batches(self, sql: str, params: list):
+        from applications import pgcopy
+        return pgcopy.iter_batches(self.dsn, sql, params)
+
+    def copy_to_csv(self, sql: str, params: list, fp: Path) -> int:
+        from applications import pgcopy
+        return pgcopy.copy_to_csv(self.dsn, sql, params, fp)
+
+
+class DuckDBSource:
+    kind = "duckdb"
+    BATCH_VECTORS = 48                    # × 2048 rows per iter_batches chunk
+
+    def __init__(self, path: str | Path, read_only: bool = True):
+        self.path, self.read_only = Path(path), read_only
+        self._con  = None
+        self._lock = threading.Lock()
+
+    def _cursor(self):
+        """Per-call cursor: safe from the iter_bars prefetch threads."""
+        import duckdb
+        with self._lock:
+            if self._con is None:
+                self._con = duckdb.connect(str(self.path), read_only=self.read_only)
+            cur = self._con.cursor()
+        cur.execute("SET TimeZone = 'UTC'")
+        return cur
+
+    @staticmethod
+    def _q(sql: str) -> str:
+        return sql.replace("%s", "?")
+
+    @staticmethod
+    def _ns(df: pd.DataFrame) -> pd.DataFrame:
+        for c in df.columns:                 # DuckDB hands back µs; match Postgres
+            if isinstance(df[c].dtype, pd.DatetimeTZDtype):
+                df[c] = df[c].astype("datetime64[ns, UTC]")
+        return df
+
+    def read(self, sql: str, params: list) -> pd.DataFrame:
+        return self._ns(self._cursor().execute(self._q(sql), params).df())
+
+    def iter_batches(self, sql: str, params: list):
+        res = self._cursor().execute(self._q(sql), params)
+        first = True
+        while True:
+            df = res.fetch_df_chunk(self.BATCH_VECTORS)
+            if len(df) or first:
+                yield self._ns(df)
+            if not len(df):
+                break
+            first = False
+
+    def copy_to_csv(self, sql: str, params: list, fp: Path) -> int:
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        part = fp.with_name(fp.name + ".part")
+        try:
+            (n,), = self._cursor().execute(
+                f"COPY ({self._q(sql.strip())}) TO '{part}' (HEADER)", params).fetchall()
+            if n:                            # empty result: fp stays as it was
+                os.replace(part, fp)
+        finally:
+            part.unlink(missing_ok=True)
+        return n
+
+
+def open_source(spec: str):
+    """'duckdb:<file>' / '<file>.duckdb' → DuckDB, anything else a Postgres DSN."""
+    if spec.startswith("duckdb:"):
+        return DuckDBSource(spec[len("duckdb:"):])
+    if spec.endswith(".duckdb"):
+        return DuckDBSource(spec)
+    return PostgresSource(spec[len("postgres:"):] if spec.startswith("postgres:") else spec)
+
+
+# ── DuckDB loader ───────────────────────────────────────────────────
+def load_csv(db: Path, symbol: str, tf: str, files: list) -> int:
+    """Append CSV months to the DuckDB file; dedupe + re-sort the table."""
+    import duckdb
+    tbl  = TF_TABLE[tf]
+    cols = [c.split()[0] for c in TABLES[tbl].split(", ")]
+    con  = duckdb.connect(str(db))
+    con.execute("SET TimeZone = 'UTC'")
+    con.execute(f"CREATE TABLE IF NOT EXISTS {tbl} (symbol VARCHAR, {TABLES[tbl]})")
+    sel = ", ".join(f"{c}::TIMESTAMPTZ" if c == "timestamp_utc" else c for c in cols)
+    for fp in files:
+        con.execute(f"INSERT INTO {tbl} SELECT ?, {sel} FROM read_csv(?)",
+                    [symbol, str(fp)])
+    con.execute(f"""
+        CREATE OR REPLACE TABLE {tbl} AS
+        SELECT DISTINCT ON (symbol, timestamp_utc) *
+        FROM   {tbl}
+        ORDER  BY symbol, timestamp_utc
+    """)
+    (n,), = con.execute(f"SELECT count(*) FROM {tbl} WHERE symbol = ?",
+                        [symbol]).fetchall()
+    con.close()
+    return n
+
+
+# ────────────────────────────────────────────────────────────────────
+def main():
+    ap  = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ld  = sub.add_parser("load", help="CSV months → DuckDB table")
+    ld.add_argument("--db", default=str(DATA_ROOT / "forex.duckdb"))
+    ld.add_argument("--symbol", required=True)
+    ld.add_argument("--tf", default="M1", choices=list(TF_TABLE))
+    ld.add_argument("files", nargs="*",
+                    help="CSV files (default: <DATA_ROOT>/<symbol>/<tf>/*.csv)")
+    args = ap.parse_args()
+
+    files = args.files or sorted((DATA_ROOT / args.symbol / args.tf).glob("*.csv"))
+    if not files:
+        sys.exit(f"no CSV files for {args.symbol} {args.tf}")
+    n = load_csv(Path(args.db), args.symbol, args.tf, files)
+    print(f"{args.db}: {TF_TABLE[args.tf]} holds {n:,} {args.symbol} rows "
+          f"({len(files)} file(s) loaded)")
+    return 0
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    sys.exit(main())
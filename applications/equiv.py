@@ -0,0 +1,180 @@
+"""
+equiv.py – differential equivalence harness: reference vs candidate
+-------------------------------------------------------------------
+CLI examples:
+    # chunked stream mode must match the one-shot reference
+    python applications/equiv.py --ref templates/mr_core \
+           --cand templates/mr_core --mode stream --n 25
+
+    # two engine versions, bars from the cache instead of the March CSV
+    python applications/equiv.py --ref 001/v6.02 --cand templates/mr_core \
+           --from 2025-03-01 --to 2025-03-31
+
+For each of `n` random cfgs drawn from the reference PARAM_SCHEMA
+(candidate 0 = defaults) both sides run on the same bars and their
+trade logs are diffed on
+    entry_time · exit_time · side · reason · layer · pips (± --tol)
+Columns an engine does not log (e.g. v6.02 has no side/layer) are
+skipped.  On the first mismatch the report shows the first divergent
+bar: OHLC + indicators there and, per engine, the tickets open and the
+realised pips at that moment.  Exit code 1 when any cfg diverged.
+
+Candidate modes:
+    run      engine entry point (run_backtest / backtest)
+    stream   run_backtest_stream over --chunk-sized pieces (W, M, D)
+    batch    run_batch(df, [cfg])[0]
+    fast     run_fast(df, cfg)
+"""
+
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+from applications import indicators, registry
+from applications.search import sample_candidates
+
+MAR_CSV = ROOT / "001" / "v5.0" / "forex_1m_Mar_2025_EURGBP.csv"
+FIELDS  = ["entry_time", "exit_time", "side", "reason", "layer", "pips"]
+ALIASES = {"ticket_cap": "max_tix", "max_tix": "ticket_cap"}
+
+
+# ── running either side ─────────────────────────────────────────────
+def run_mode(engine, mode: str, bars: pd.DataFrame, cfg: dict,
+             chunk: str = "W") -> pd.DataFrame:
+    if mode == "run":
+        return registry.run(engine, bars.copy(), cfg)[0]
+    if mode == "stream":
+        keys   = bars.index.tz_localize(None).to_period(chunk)
+        frames = (g.copy() for _, g in bars.groupby(keys, sort=True))
+        return registry.run_stream(engine, frames, cfg)[0]
+    if mode == "batch":
+        return registry.normalise(engine.run_batch(bars.copy(), [cfg])[0])[0]
+    if mode == "fast":
+        return registry.normalise(engine.run_fast(bars.copy(), cfg))[0]
+    raise ValueError(f"unknown mode: {mode}")
+
+
+def translate(cfg: dict, engine) -> dict:
+    """Reference cfg → candidate cfg (aliases + candidate defaults)."""
+    base = registry.default_cfg(engine)
+    out  = dict(base)
+    for k, v in cfg.items():
+        if k in base or k not in ALIASES:
+            out[k] = v
+        elif ALIASES[k] in base:
+            out[ALIASES[k]] = v
+    return out
+
+
+# ── diffing ─────────────────────────────────────────────────────────
+def _ordered(log: pd.DataFrame) -> pd.DataFrame:
+    if log.empty:
+        return log.reset_index(drop=True)
+    keys = [c for c in ("exit_time", "entry_time", "side", "layer")
+            if c in log and log[c].notna().any()]
+    return log.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+def first_mismatch(a: pd.DataFrame, b: pd.DataFrame, tol: float):
+    """(row, field) of the first differing trade, or None when equal."""
+    a, b = _ordered(a), _ordered(b)
+    fields = [f for f in FIELDS
+              if f in a and f in b and a[f].notna().any() and b[f].notna().any()]
+    for i in range(min(len(a), len(b))):
+        for f in fields:
+            x, y = a.at[i, f], b.at[i, f]
+            same = abs(x - y) <= tol if f == "pips" else x == y
+            if not same:
+                return i, f
+    if len(a) != len(b):
+        return min(len(a), len(b)), "count"
+    return None
+
+
+def state_at(log: pd.DataFrame, bar: pd.Timestamp) -> dict:
+    """Tickets open at `bar` and pips realised before it."""
+    if log.empty:
+        return {"open": [], "realised_pips": 0.0, "closed": 0}
+    live   = log[(log.entry_time <= bar) & (log.exit_time > bar)]
+    closed = log[log.exit_time < bar]
+    cols   = [c for c in ("side", "layer", "entry_time") if c in log]
+    return {"open": live[cols].to_dict("records"),
+            "realised_pips": round(float(closed.pips.sum()), 4),
+            "closed": int(len(closed))}
+
+
+def divergence_report(bars, ref_log, cand_log, row, field, cfg=None) -> str:
+    """Bar and trade context at the first mismatch; indicators use the
+    windows of `cfg` (the reference run's cfg)."""
+    a, b = _ordered(ref_log), _ordered(cand_log)
+    times = [t for log in (a, b) if row < len(log)
+             for t in (log.at[row, "entry_time"], log.at[row, "exit_time"])
+             if pd.notna(t)]
+    bar = min(times)
+    ind = indicators.mr_indicators(bars, *indicators.windows(cfg or {}))
+    snap = {**bars.loc[bar, ["open", "high", "low", "close"]].to_dict(),
+            **ind.loc[bar].round(6).to_dict()}
+    lines = [f"  first divergent trade #{row} ({field}); first divergent bar {bar}",
+             f"  bar        {snap}"]
+    for name, log in (("ref ", a), ("cand", b)):
+        trade = log.iloc[row][[f for f in FIELDS if f in log]].to_dict() \
+                if row < len(log) else "—"
+        lines.append(f"  {name} trade {trade}")
+        lines.append(f"  {name} state {state_at(log, bar)}")
+    return "\n".join(lines)
+
+
+# ────────────────────────────────────────────────────────────────────
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ref",  default="templates/mr_core")
+    ap.add_argument("--cand", default="templates/mr_core")
+    ap.add_argument("--mode", default="stream",
+                    choices=["run", "stream", "batch", "fast"])
+    ap.add_argument("--chunk", default="W", help="stream chunk: D, W or M")
+    ap.add_argument("--n",    type=int,   default=20)
+    ap.add_argument("--seed", type=int,   default=0)
+    ap.add_argument("--span", type=float, default=0.5)
+    ap.add_argument("--tol",  type=float, default=1e-6, help="pips tolerance")
+    ap.add_argument("--csv",  default=str(MAR_CSV))
+    ap.add_argument("--from", dest="start")
+    ap.add_argument("--to",   dest="end")
+    ap.add_argument("--symbol", default="EURGBP")
+    args = ap.parse_args()
+
+    if args.start and args.end:
+        from applications.backtest_wrapper import load_bars
+        bars = load_bars(args.symbol, args.start, args.end)
+    else:
+        bars = pd.read_csv(args.csv, parse_dates=["timestamp_utc"],
+                           usecols=["timestamp_utc", "open", "high", "low", "close"])
+        bars = bars.set_index("timestamp_utc")
+
+    ref, cand = registry.load(args.ref), registry.load(args.cand)
+    schema = ref.PARAM_SCHEMA
+    shared = {k: v for k, v in schema.items()
+              if k in registry.default_cfg(cand) or ALIASES.get(k) in registry.default_cfg(cand)}
+    cfgs = sample_candidates(shared, args.n, {}, span=args.span, seed=args.seed)
+
+    bad = 0
+    for i, drawn in enumerate(cfgs):
+        ref_cfg  = {**registry.default_cfg(ref), **drawn}
+        cand_cfg = translate(ref_cfg, cand)
+        ref_log  = run_mode(ref,  "run",     bars, ref_cfg)
+        cand_log = run_mode(cand, args.mode, bars, cand_cfg, args.chunk)
+        hit = first_mismatch(ref_log, cand_log, args.tol)
+        tag = "ok  " if hit is None else "DIFF"
+        print(f"[{tag}] cfg {i:>3}  trades {len(ref_log):>5} / {len(cand_log):<5} {drawn}")
+        if hit is not None:
+            bad += 1
+            print(divergence_report(bars, ref_log, cand_log, *hit, ref_cfg))
+    print(f"{len(cfgs) - bad}/{len(cfgs)} cfgs equivalent "
+          f"({args.ref} vs {args.cand}:{args.mode})")
+    return 1 if bad else 0
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    sys.exit(main())
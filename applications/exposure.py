@@ -0,0 +1,99 @@
+"""
+exposure.py – mark-to-market per-bar equity and exposure timeline
+-----------------------------------------------------------------
+    tl = timeline(bars, entry_ns, exit_ns, side, pips)      # one row per bar
+    tl = from_book(bars, book, opens)                       # σ-MR engines
+    summary(tl) → {"max_tickets", "max_net_long", "max_net_short",
+                   "bars_exposed_%", "mtm_max_dd_pips", "intrabar_max_dd_pips"}
+
+Engines only book a trade when it closes, so their equity steps at
+exits and open tickets are invisible.  With cfg["exposure"] set, the
+σ-MR engines (templates/mr_core, 001/v6.02) attach this timeline as
+trade_log.attrs["exposure"]:
+
+    tickets       tickets open after the bar
+    net           longs − shorts open after the bar
+    unreal_pips   open tickets marked at the bar's close
+    worst_pips    tickets held through the bar marked at its low (longs)
+                  / high (shorts) – the intrabar worst case
+    realized_pips closed pips so far
+    mtm_pips      realized + unrealized
+
+No per-bar loop: entry / exit bar indexes come from searchsorted, and
+every ticket adds +1 at its entry bar and −1 at its exit bar to a
+difference array (bincount), so counts, net side and Σ side·entry price
+are cumsums.  Unrealized pips are then (close·net − Σ side·entry)·1e4.
+Entries fill at the signal bar's close; a ticket leaves the open set on
+the bar that closes it, at its booked exit price.
+"""
+
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from applications.tradebook import LONG
+
+COLS = ["tickets", "net", "unreal_pips", "worst_pips", "realized_pips", "mtm_pips"]
+OPEN = np.iinfo(np.int64).max           # exit_ns of a ticket still open
+
+
+def _acc(start: np.ndarray, stop: np.ndarray, n: int, w=None) -> np.ndarray:
+    """Σ w over intervals [start, stop) at every bar 0…n-1."""
+    d = np.bincount(start, w, n + 1) - np.bincount(stop, w, n + 1)
+    return np.cumsum(d[:n])
+
+
+def timeline(bars: pd.DataFrame, entry_ns, exit_ns, side, pips) -> pd.DataFrame:
+    """Per-bar exposure for tickets given as arrays (side: tradebook LONG/SHORT)."""
+    ns    = bars.index.asi8
+    close = bars["close"].to_numpy(dtype=float)
+    n     = len(ns)
+    ei    = np.searchsorted(ns, np.asarray(entry_ns, dtype=np.int64))
+    xi    = np.searchsorted(ns, np.asarray(exit_ns, dtype=np.int64))
+    sgn   = np.where(np.asarray(side) == LONG, 1.0, -1.0)
+    ep    = close[np.minimum(ei, n - 1)] if n else np.zeros(len(ei))
+    held  = np.minimum(ei + 1, xi)               # bars fully held: (entry, exit)
+    lg    = sgn > 0
+
+    tickets = _acc(ei, xi, n).astype(np.int32)
+    net     = _acc(ei, xi, n, sgn).astype(np.int32)
+    unreal  = (close * net - _acc(ei, xi, n, sgn * ep)) * 1e4
+    worst   = ((bars["low"].to_numpy(dtype=float) * _acc(held[lg], xi[lg], n)
+                - _acc(held[lg], xi[lg], n, ep[lg]))
+               - (bars["high"].to_numpy(dtype=float) * _acc(held[~lg], xi[~lg], n)
+                  - _acc(held[~lg], xi[~lg], n, ep[~lg]))) * 1e4
+    real    = np.cumsum(np.bincount(xi, np.asarray(pips, dtype=float), n + 1)[:n])
+    return pd.DataFrame({"tickets": tickets, "net": net, "unreal_pips": unreal,
+                         "worst_pips": worst, "realized_pips": real,
+                         "mtm_pips": real + unreal}, index=bars.index)
+
+
+def from_book(bars: pd.DataFrame, book, opens=()) -> pd.DataFrame:
+    """Timeline from a TradeBook plus the engine's still-open tickets
+    [(side, entry_px, entry_ts, layer), …]."""
+    k = book.n
+    return timeline(
+        bars,
+        np.r_[book.entry_ns[:k], [et.value for _, _, et, _ in opens]],
+        np.r_[book.exit_ns[:k], np.full(len(opens), OPEN)],
+        np.r_[book.side[:k], [LONG if s == "long" else 1 - LONG for s, *_ in opens]],
+        np.r_[book.pips[:k], np.zeros(len(opens))])
+
+
+def summary(tl: pd.DataFrame) -> dict:
+    """Headline figures of a timeline (drawdowns from the 0-pip start)."""
+    if tl.empty:
+        return {"max_tickets": 0, "max_net_long": 0, "max_net_short": 0,
+                "bars_exposed_%": None, "mtm_max_dd_pips": 0.0,
+                "intrabar_max_dd_pips": 0.0}
+    mtm  = tl["mtm_pips"].to_numpy()
+    peak = np.maximum(np.maximum.accumulate(mtm), 0.0)
+    prev = np.r_[0.0, peak[:-1]]                 # best mark before the bar
+    low  = tl["realized_pips"].to_numpy() + tl["worst_pips"].to_numpy()
+    return {"max_tickets":   int(tl["tickets"].max()),
+            "max_net_long":  int(max(tl["net"].max(), 0)),
+            "max_net_short": int(max(-tl["net"].min(), 0)),
+            "bars_exposed_%": round(float((tl["tickets"] > 0).mean() * 100), 2),
+            "mtm_max_dd_pips": round(float((peak - mtm).max()), 2),
+            "intrabar_max_dd_pips": round(float(max((prev - low).max(),
+                                                    (peak - mtm).max())), 2)}
@@ -0,0 +1,56 @@
+"""
+guards.py – entry-guard rejection counters for the σ-MR hot loop
+----------------------------------------------------------------
+Engines bump plain int64 arrays in the loop (no dicts, no calls):
+
+    gs = GuardStats()
+    hr, day = gs.hour, None
+    ...                                   # on session-day reset
+    day = gs.new_day(cal.day_label(cal.day[i]))   # sessions.calendar
+    ...                                   # every bar reaching the guards
+    hr[SEEN, h] += 1; day[SEEN] += 1
+    ...                                   # guard k blocks the entry
+    hr[k, h] += 1; day[k] += 1; continue
+
+Row SEEN counts bars that reached the guard chain; a guard's pass count
+is what reached it minus what it rejected.  `report()` turns the arrays
+into the "entry_guards" section of the result bundle.
+"""
+
+from __future__ import annotations
+import numpy as np
+
+GUARDS = ("ticket_cap", "atr_gate", "drift", "edge", "no_signal")
+SEEN, CAP, ATR, DRIFT, EDGE, NO_SIGNAL = range(len(GUARDS) + 1)
+
+
+class GuardStats:
+    def __init__(self):
+        self.hour = np.zeros((len(GUARDS) + 1, 24), dtype=np.int64)
+        self.days = []
+        self.rows = []
+
+    def new_day(self, day) -> np.ndarray:
+        row = np.zeros(len(GUARDS) + 1, dtype=np.int64)
+        self.days.append(str(day))
+        self.rows.append(row)
+        return row
+
+    def report(self) -> dict:
+        tot     = self.hour.sum(axis=1)
+        arrived = tot[SEEN] - np.r_[0, np.cumsum(tot[1:])][:-1]
+        by_day  = np.vstack(self.rows) if self.rows else \
+                  np.zeros((0, len(GUARDS) + 1), dtype=np.int64)
+        return {
+            "bars": int(tot[SEEN]),
+            "entries": int(tot[SEEN] - tot[1:].sum()),
+            "guards": {g: {"rejected": int(tot[i + 1]),
+                           "passed": int(arrived[i] - tot[i + 1])}
+                       for i, g in enumerate(GUARDS)},
+            "by_hour": {"bars": self.hour[SEEN].tolist(),
+                        **{g: self.hour[i + 1].tolist()
+                           for i, g in enumerate(GUARDS)}},
+            "by_day": {d: {"bars": int(r[SEEN]),
+                           **{g: int(r[i + 1]) for i, g in enumerate(GUARDS)}}
+                       for d, r in zip(self.days, by_day)},
+        }
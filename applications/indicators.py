@@ -0,0 +1,149 @@
+"""
+indicators.py – shared σ-MR indicator block
+-------------------------------------------
+The sma / sigma / z / ATR block every 001 engine computes (windows are
+the ma_bars / sig_bars / atr_bars / sig_floor tunables, see windows()):
+
+    sma   = close.rolling(MA_BARS, 1).mean()
+    sigma = close.rolling(SIG_BARS, 1).std().clip(lower=SIG_FLOOR)
+    z     = (close - sma) / sigma
+    atr   = true_range.rolling(ATR_BARS, 1).mean() * 1e4     # pips
+
+and the session-day range features behind the edge_pct veto:
+
+    hi, lo = high / low cummax / cummin within each session day
+    rng    = hi - lo
+    pos    = (close - lo) / rng            (0.5 while rng == 0)
+
+The block comes from the fused kernel in kernels.py (one pass, exact
+int64 sums on FX price grids); the per-frame IndicatorBank prepares
+its inputs once, so a block for any other window set is one more pass,
+not another set of rolling objects.  mr_block exposes the same kernel
+with rolling()'s min_periods for the stand-alone scripts.
+
+Banks and blocks are memoised per (bars object, windows): when several
+engines or sweep candidates are driven over the same frame
+(multi_runner, search) the work is done once and handed to each of
+them.  Frames are treated as read-only – the memo is keyed on object
+identity, not content.
+"""
+
+from __future__ import annotations
+import weakref
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+
+from applications import kernels
+
+MA_BARS   = 30
+SIG_BARS  = 5
+ATR_BARS  = 5
+SIG_FLOOR = 0.00030
+
+
+def windows(cfg: dict) -> Tuple[int, int, int, float]:
+    """(ma_bars, sig_bars, atr_bars, sig_floor) from an engine cfg."""
+    return (int(cfg.get("ma_bars", MA_BARS)), int(cfg.get("sig_bars", SIG_BARS)),
+            int(cfg.get("atr_bars", ATR_BARS)),
+            float(cfg.get("sig_floor", SIG_FLOOR)))
+
+
+def warm_bars(ma_bars: int, sig_bars: int, atr_bars: int, *_) -> int:
+    """Rows a chunked run carries over so every rolling window lines up."""
+    return max(ma_bars, sig_bars, atr_bars + 1)
+
+
+_MEMO: Dict[Tuple, Tuple[weakref.ref, int, pd.DataFrame]] = {}
+
+
+def _memo(df: pd.DataFrame, key: Tuple, fn) -> pd.DataFrame:
+    key = (id(df),) + key
+    hit = _MEMO.get(key)
+    if hit is not None and hit[0]() is df and hit[1] == len(df):
+        return hit[2]
+    out = fn()
+    for k in [k for k, v in _MEMO.items() if v[0]() is None]:
+        del _MEMO[k]
+    _MEMO[key] = (weakref.ref(df), len(df), out)
+    return out
+
+
+# ── per-frame bank → fused kernel (applications/kernels.py) ─────────
+class IndicatorBank:
+    """One frame's close / high / low, prepared once for the kernels.
+
+    Preparation (grid detection, int64 points, NaN masks) is the only
+    part that depends on the frame, so a window sweep pays it once and
+    each (ma, sig, atr) set is a single fused pass.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.index = df.index
+        self.prep  = kernels.prepare(df.close, df.high, df.low)
+
+    def block(self, ma_bars: int, sig_bars: int, atr_bars: int,
+              sig_floor: float = 0.0, min_periods: int | None = 1,
+              atr_unit: float = 1e4) -> pd.DataFrame:
+        sma, sigma, z, tr, atr = kernels.sigma_atr(
+            self.prep, ma_bars, sig_bars, atr_bars, sig_floor,
+            min_periods, atr_unit)
+        return pd.DataFrame({"sma": sma, "sigma": sigma, "z": z,
+                             "tr": tr, "atr": atr}, index=self.index)
+
+
+def bank(df: pd.DataFrame) -> IndicatorBank:
+    """The frame's IndicatorBank (memoised like the blocks built from it)."""
+    return _memo(df, ("bank",), lambda: IndicatorBank(df))
+
+
+def mr_indicators(df: pd.DataFrame, ma_bars: int = MA_BARS,
+                  sig_bars: int = SIG_BARS, atr_bars: int = ATR_BARS,
+                  sig_floor: float = SIG_FLOOR) -> pd.DataFrame:
+    """DataFrame[sma, sigma, z, atr] aligned to `df.index`."""
+    return _memo(df, (ma_bars, sig_bars, atr_bars, sig_floor),
+                 lambda: bank(df).block(ma_bars, sig_bars, atr_bars, sig_floor))
+
+
+def _day_range(df: pd.DataFrame, day: np.ndarray, carry) -> pd.DataFrame:
+    hi = df.high.groupby(day).cummax().to_numpy(copy=True)
+    lo = df.low.groupby(day).cummin().to_numpy(copy=True)
+    if carry is not None:                  # day still open from the last chunk
+        same = day == carry[0]
+        hi[same] = np.maximum(hi[same], carry[1])
+        lo[same] = np.minimum(lo[same], carry[2])
+    rng = hi - lo
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pos = np.where(rng != 0, (df.close.to_numpy() - lo) / rng, 0.5)
+    return pd.DataFrame({"hi": hi, "lo": lo, "rng": rng, "pos": pos},
+                        index=df.index)
+
+
+def mr_block(df: pd.DataFrame, ma_bars: int = MA_BARS,
+             sig_bars: int = SIG_BARS, atr_bars: int = ATR_BARS,
+             sig_floor: float = 0.0, min_periods: int | None = 1,
+             atr_unit: float = 1.0) -> pd.DataFrame:
+    """DataFrame[sma, sigma, z, tr, atr] with rolling()'s knobs exposed.
+
+    For the stand-alone 001 scripts: min_periods=None is rolling's
+    full-window default, atr_unit=1 keeps ATR in price units.
+    """
+    return bank(df).block(ma_bars, sig_bars, atr_bars, sig_floor,
+                          min_periods, atr_unit)
+
+
+def day_range(df: pd.DataFrame, day: np.ndarray,
+              carry: Tuple | None = None) -> pd.DataFrame:
+    """DataFrame[hi, lo, rng, pos] – running range of each session day.
+
+    `day` is one id per bar (sessions.calendar(...).day); `carry` =
+    (day, hi, lo) of a day that began in an earlier chunk.
+    """
+    return _memo(df, ("range", carry), lambda: _day_range(df, day, carry))
+
+
+def edge_mask(z, pos, edge_pct: float) -> np.ndarray:
+    """Bars the edge_pct veto blocks: stretched up near the day's high,
+    or down near its low."""
+    z, pos = np.asarray(z), np.asarray(pos)
+    return (z > 0) & (pos > 1 - edge_pct) | (z < 0) & (pos < edge_pct)
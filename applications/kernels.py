@@ -0,0 +1,245 @@
+"""
+kernels.py – fused rolling sma / sigma / z / TR / ATR kernel
+------------------------------------------------------------
+    prep = prepare(df.close, df.high, df.low)            # once per frame
+    sma, sigma, z, tr, atr = sigma_atr(prep, 30, 5, 5, 0.0003)
+
+One pass over contiguous arrays slides the three windows (ma, sig, atr)
+together and writes all five outputs – no pandas rolling objects, no
+intermediate Series.  Semantics match the pandas blocks it replaces:
+
+    sma   = close.rolling(ma_bars, min_periods).mean()
+    sigma = close.rolling(sig_bars, min_periods).std().clip(lower=sig_floor)
+    z     = (close - sma) / sigma
+    tr    = max(high - low, |high - prev close|, |low - prev close|)
+    atr   = tr.rolling(atr_bars, min_periods).mean() * atr_unit
+
+NaN bars drop out of the window counts like they do in rolling();
+min_periods=None means "the full window" (rolling's own default).
+
+Numerics: prices on a decimal grid (every FX quote) are carried as int64
+points, so window sums and the sigma numerator n·Σx² − (Σx)² are exact;
+other inputs are centred on the first close and summed with Neumaier
+compensation.  With numba installed the loop is JIT-compiled (cached on
+disk); without it the same maths run as numpy prefix sums.  On the
+int path both produce bit-identical results.  FOREX_KERNELS=numpy
+forces the fallback; `python applications/kernels.py` checks that both
+backends agree (random walk, flat windows, gaps).
+"""
+
+from __future__ import annotations
+import math, os
+from typing import NamedTuple, Tuple
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:                      # numpy fallback below
+    njit = None
+
+KERNELS = "numba" if njit is not None and \
+          os.environ.get("FOREX_KERNELS", "numba") != "numpy" else "numpy"
+_SCALES = (1e2, 1e3, 1e4, 1e5, 1e6)
+
+
+class Prepared(NamedTuple):
+    close: np.ndarray        # float64, as given
+    x:     np.ndarray        # close in points (int64) or centred (float64)
+    hp:    np.ndarray        # high, same units as x
+    lp:    np.ndarray        # low,  same units as x
+    xok:   np.ndarray        # close is a number
+    tok:   np.ndarray        # true range defined (high, low, prev close)
+    scale: float             # points per price unit (1.0 on the float path)
+    off:   float             # price added back to means (float path centre)
+    big:   float             # max |x|, for the int64 overflow guard
+
+
+# ── per-frame preparation ───────────────────────────────────────────
+def _points(x: np.ndarray) -> Tuple[np.ndarray | None, float]:
+    """Prices on a decimal grid → exact int64 points (+ scale), if they fit."""
+    v = np.where(np.isfinite(x), x, 0.0)
+    for s in _SCALES:
+        p = np.rint(v * s)
+        big = float(np.abs(p).max(initial=0))
+        if np.abs(v * s - p).max(initial=0) < 1e-6 and big * big * len(v) < 2**62:
+            return p.astype(np.int64), s
+    return None, 1.0
+
+
+def prepare(close, high, low) -> Prepared:
+    c = np.ascontiguousarray(close, dtype=float)
+    h = np.ascontiguousarray(high, dtype=float)
+    l = np.ascontiguousarray(low, dtype=float)
+    n = len(c)
+    xok = np.isfinite(c)
+    tok = np.isfinite(h) & np.isfinite(l) & np.r_[False, xok[:-1]][:n]
+    pts, scale = _points(np.concatenate([c, h, l]))
+    if pts is not None:
+        x, hp, lp, off = pts[:n], pts[n:2 * n], pts[2 * n:], 0.0
+    else:
+        off = float(c[xok][0]) if xok.any() else 0.0
+        x, hp, lp = (np.where(np.isfinite(a), a - off, 0.0) for a in (c, h, l))
+    return Prepared(c, x, hp, lp, xok, tok, scale, off,
+                    float(np.abs(x).max(initial=0)))
+
+
+# ── numba kernel ────────────────────────────────────────────────────
+def _fused(x, hp, lp, xok, tok, close, scale, off, ma, sg, at, floor,
+           nma, nsg, nat, unit, sma, sigma, z, tr, atr):
+    zero = x[:0].sum()
+    m1 = v1 = v2 = t1 = zero             # window sums
+    c1 = d1 = d2 = e1 = zero             # Neumaier compensation (0 on ints)
+    mc = vc = tc = 0
+    trp = np.empty_like(x)
+    for i in range(len(x)):
+        if xok[i]:
+            xi = x[i]
+            t = m1 + xi
+            c1 += (m1 - t) + xi if abs(m1) >= abs(xi) else (xi - t) + m1
+            m1 = t; mc += 1
+            t = v1 + xi
+            d1 += (v1 - t) + xi if abs(v1) >= abs(xi) else (xi - t) + v1
+            v1 = t
+            q = xi * xi; t = v2 + q
+            d2 += (v2 - t) + q if abs(v2) >= abs(q) else (q - t) + v2
+            v2 = t; vc += 1
+        j = i - ma
+        if j >= 0 and xok[j]:
+            q = -x[j]; t = m1 + q
+            c1 += (m1 - t) + q if abs(m1) >= abs(q) else (q - t) + m1
+            m1 = t; mc -= 1
+        j = i - sg
+        if j >= 0 and xok[j]:
+            q = -x[j]; t = v1 + q
+            d1 += (v1 - t) + q if abs(v1) >= abs(q) else (q - t) + v1
+            v1 = t
+            q = -(x[j] * x[j]); t = v2 + q
+            d2 += (v2 - t) + q if abs(v2) >= abs(q) else (q - t) + v2
+            v2 = t; vc -= 1
+        if tok[i]:
+            p = x[i - 1]
+            r = max(hp[i] - lp[i], max(abs(hp[i] - p), abs(lp[i] - p)))
+            trp[i] = r
+            tr[i] = r / scale
+            t = t1 + r
+            e1 += (t1 - t) + r if abs(t1) >= abs(r) else (r - t) + t1
+            t1 = t; tc += 1
+        else:
+            tr[i] = np.nan
+        j = i - at
+        if j >= 0 and tok[j]:
+            q = -trp[j]; t = t1 + q
+            e1 += (t1 - t) + q if abs(t1) >= abs(q) else (q - t) + t1
+            t1 = t; tc -= 1
+
+        sma[i] = (m1 + c1) / (mc * scale) + off if mc >= nma else np.nan
+        if vc >= nsg:
+            s1, s2 = v1 + d1, v2 + d2
+            num = vc * s2 - s1 * s1
+            sd = math.sqrt(max(num, zero) / (vc * (vc - 1) * scale * scale))
+            sigma[i] = max(sd, floor)
+        else:
+            sigma[i] = np.nan
+        z[i] = (close[i] - sma[i]) / sigma[i]
+        atr[i] = (t1 + e1) / (tc * scale / unit) if tc >= nat else np.nan
+
+
+# error_model="numpy": a flat window (sigma 0, no floor) gives z = nan / ±inf
+# like the fallback and pandas, instead of raising ZeroDivisionError
+_fused_jit = (njit(cache=True, nogil=True, error_model="numpy")(_fused)
+              if njit is not None else None)
+
+
+# ── numpy fallback: prefix sums, same formulas ──────────────────────
+def _prefix(a: np.ndarray) -> np.ndarray:
+    return np.concatenate([np.zeros(1, dtype=a.dtype), np.cumsum(a)])
+
+
+def _win(pre: np.ndarray, n: int) -> np.ndarray:
+    hi = np.arange(1, len(pre))
+    return pre[hi] - pre[np.maximum(hi - n, 0)]
+
+
+def _numpy(p: Prepared, x, hp, lp, ma, sg, at, floor, nma, nsg, nat, unit):
+    prev = np.r_[x[:1] * 0, x[:-1]]
+    trp  = np.maximum(hp - lp, np.maximum(np.abs(hp - prev), np.abs(lp - prev)))
+    trp  = np.where(p.tok, trp, 0)
+    xz   = np.where(p.xok, x, 0)
+    n1, s1, s2 = _prefix(p.xok.astype(np.int64)), _prefix(xz), _prefix(xz * xz)
+    nt, st = _prefix(p.tok.astype(np.int64)), _prefix(trp)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mc, m1 = _win(n1, ma), _win(s1, ma)
+        sma = np.where(mc >= nma, m1 / (mc * p.scale), np.nan) + p.off
+        vc, v1, v2 = _win(n1, sg), _win(s1, sg), _win(s2, sg)
+        num = vc * v2 - v1 * v1
+        var = np.maximum(num, 0) / (vc * (vc - 1) * p.scale * p.scale)
+        sd  = np.sqrt(np.where(vc >= nsg, var, np.nan))
+        sigma = np.where(np.isnan(sd), sd, np.maximum(sd, floor))
+        tc, t1 = _win(nt, at), _win(st, at)
+        atr = np.where(tc >= nat, t1 / (tc * p.scale / unit), np.nan)
+        tr  = np.where(p.tok, trp / p.scale, np.nan)
+        z   = (p.close - sma) / sigma
+    return sma, sigma, z, tr, atr
+
+
+# ────────────────────────────────────────────────────────────────────
+def sigma_atr(p: Prepared, ma_bars: int, sig_bars: int, atr_bars: int,
+              sig_floor: float = 0.0, min_periods: int | None = 1,
+              atr_unit: float = 1.0, backend: str | None = None):
+    """(sma, sigma, z, tr, atr) float64 arrays; tr in price units,
+    atr in price units × atr_unit (1e4 → pips).  backend: "numba" /
+    "numpy", default KERNELS."""
+    nma, nsg, nat = (max(1, w if min_periods is None else min_periods)
+                     for w in (ma_bars, sig_bars, atr_bars))
+    nsg = max(nsg, 2)                                 # ddof=1
+    x, hp, lp = p.x, p.hp, p.lp
+    if x.dtype.kind == "i" and (max(ma_bars, sig_bars) * p.big) ** 2 >= 2**62:
+        x, hp, lp = (a.astype(float) for a in (x, hp, lp))   # would overflow
+    args = (ma_bars, sig_bars, atr_bars, float(sig_floor), nma, nsg, nat,
+            float(atr_unit))
+    if (backend or KERNELS) == "numpy" or _fused_jit is None:
+        return _numpy(p, x, hp, lp, *args)
+    out = [np.empty(len(x)) for _ in range(5)]
+    _fused_jit(x, hp, lp, p.xok, p.tok, p.close, float(p.scale), p.off,
+               *args, *out)
+    return tuple(out)
+
+
+# ── backend parity check ────────────────────────────────────────────
+def parity(n: int = 5_000, seed: int = 0) -> list:
+    """Cases where the numba and numpy backends disagree (empty = ok)."""
+    rng   = np.random.default_rng(seed)
+    walk  = 0.85 + np.cumsum(rng.integers(-3, 4, n)) * 5e-6
+    flat  = walk.copy()
+    flat[100:160] = flat[100]                    # sigma 0 inside the window
+    gaps  = walk.copy()
+    gaps[rng.integers(0, n, n // 50)] = np.nan
+    bad = []
+    for name, c in (("walk", walk), ("flat", flat), ("gaps", gaps),
+                    ("float", walk + rng.normal(0, 1e-9, n))):
+        p = prepare(c, c + 2e-5, c - 2e-5)
+        exact = p.x.dtype.kind == "i"            # int path: bit-identical
+        for mp in (1, None):
+            for floor in (0.0, 0.0003):
+                a = sigma_atr(p, 30, 5, 5, floor, mp, backend="numba")
+                b = sigma_atr(p, 30, 5, 5, floor, mp, backend="numpy")
+                live = ~(b[1] < 1e-7)            # sigma above float noise
+                for col, u, v in zip(("sma", "sigma", "z", "tr", "atr"), a, b):
+                    if col == "z" and not exact:
+                        u, v = u[live], v[live]
+                    same = (np.array_equal(u, v, equal_nan=True) if exact else
+                            np.allclose(u, v, rtol=1e-6, atol=1e-8, equal_nan=True))
+                    if not same:
+                        bad.append((name, mp, floor, col))
+    return bad
+
+
+if __name__ == "__main__":
+    import sys, pathlib
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+    from applications import kernels     # the numba disk cache is keyed on it
+    if kernels.njit is None:
+        raise SystemExit("numba not installed – only the numpy backend exists")
+    bad = kernels.parity()
+    print("numba / numpy backends agree" if not bad else f"MISMATCH {bad}")
+    raise SystemExit(1 if bad else 0)
@@ -0,0 +1,200 @@
+"""
+manifest.py – validate cached months once, remember which are clean
+--------------------------------------------------------------------
+CLI examples:
+    python applications/manifest.py EURGBP --tf M1          # (re)check stale months
+    python applications/manifest.py EURGBP --tf M1 --fix    # dedupe / sort / drop bad rows
+
+Every <DATA_ROOT>/<symbol>/<tf>/ directory gets a manifest.json:
+    {"2025-03": {"rows", "size", "mtime_ns", "sha256", "first", "last",
+                 "bad_ts", "nan_ohlc", "dups", "sorted",
+                 "missing_min", "gaps": [[after, before, missing, weekend], …],
+                 "trusted"[, "shrank"]}, …}
+
+A month is *trusted* when every timestamp parses, OHLC has no NaN,
+there are no duplicate timestamps and rows are in time order.  Gaps
+(missing minutes) never block trust – FX closes every weekend – they
+are only indexed; `weekend` marks gaps that cover a Saturday.  A month
+written over one with more rows or a wider first…last span is marked
+"shrank" and untrusted (record(..., prev=old entry)).
+
+backtest_wrapper records a month right after writing it to the cache
+and tags frames loaded from a trusted month with df.attrs["trusted"];
+engines may then skip their defensive coerce / dropna / dedupe / sort
+passes.  Entries are keyed on size + mtime, so a re-exported month is
+untrusted until validated again.
+"""
+
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import hashlib, json, os, threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from applications.resample import ALL_MINUTES
+
+DATA_ROOT = ROOT / "data"
+NAME      = "manifest.json"
+OHLC      = ["open", "high", "low", "close"]
+_LOCK     = threading.Lock()
+_CACHE    = {}                     # manifest path → (mtime_ns, dict)
+
+
+# ── checks ──────────────────────────────────────────────────────────
+def sha256(fp: Path) -> str:
+    h = hashlib.sha256()
+    with open(fp, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def gap_index(ts: pd.Series, minutes: int) -> list:
+    """[[after, before, missing_bars, weekend], …] for every hole > 1 bar."""
+    ns   = ts.to_numpy(dtype="datetime64[ns]").view("i8")
+    step = minutes * 60 * 1_000_000_000
+    d    = np.diff(ns)
+    at   = np.flatnonzero(d > step)
+    out  = []
+    for i in at:
+        a, b = ts.iloc[i], ts.iloc[i + 1]
+        days = pd.date_range(a.normalize(), b.normalize(), freq="D")
+        out.append([a.isoformat(), b.isoformat(), int(d[i] // step - 1),
+                    bool((days.dayofweek == 5).any())])
+    return out
+
+
+def validate(fp: Path, tf: str, df: pd.DataFrame | None = None) -> dict:
+    """Manifest entry for one cached month (df: the frame just written)."""
+    if df is None:
+        df = pd.read_csv(fp)
+    raw = df["timestamp_utc"]
+    ts  = (raw if isinstance(raw.dtype, pd.DatetimeTZDtype) else
+           pd.to_datetime(raw, utc=True, errors="coerce", format="ISO8601"))
+    bad   = int(ts.isna().sum())
+    ok    = ts.dropna()
+    cols  = [c for c in OHLC if c in df]
+    nan   = int(df[cols].isna().any(axis=1).sum()) if cols else 0
+    dups  = int(ok.duplicated().sum())
+    srt   = bool(ok.is_monotonic_increasing)
+    gaps  = (gap_index(ok.drop_duplicates().sort_values().reset_index(drop=True),
+                       ALL_MINUTES[tf]) if tf in ALL_MINUTES and len(ok) else [])
+    st = fp.stat()
+    return {
+        "rows": int(len(df)), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+        "sha256": sha256(fp),
+        "first": ok.min().isoformat() if len(ok) else None,
+        "last":  ok.max().isoformat() if len(ok) else None,
+        "bad_ts": bad, "nan_ohlc": nan, "dups": dups, "sorted": srt,
+        "missing_min": int(sum(g[2] for g in gaps) * ALL_MINUTES.get(tf, 0)),
+        "gaps": gaps,
+        "trusted": bad == 0 and nan == 0 and dups == 0 and srt,
+    }
+
+
+def repair(fp: Path) -> int:
+    """Drop unparsable / NaN / duplicate rows, sort, rewrite; rows dropped."""
+    df = pd.read_csv(fp)
+    n  = len(df)
+    df["timestamp_utc"] = pd.to_datetime(df["timestamp_utc"], utc=True,
+                                         errors="coerce", format="ISO8601")
+    df = (df.dropna(subset=["timestamp_utc", *[c for c in OHLC if c in df]])
+            .drop_duplicates("timestamp_utc", keep="last")
+            .sort_values("timestamp_utc", kind="stable"))
+    df.to_csv(fp, index=False, date_format="%Y-%m-%dT%H:%M:%SZ")
+    return n - len(df)
+
+
+# ── manifest file ───────────────────────────────────────────────────
+def _load(path: Path) -> dict:
+    try:
+        mt = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    hit = _CACHE.get(path)
+    if hit is None or hit[0] != mt:
+        hit = _CACHE[path] = (mt, json.loads(path.read_text()))
+    return hit[1]
+
+
+def shrank(entry: dict, prev: dict | None) -> bool:
+    """Fewer rows or a narrower first…last span than the previous entry."""
+    if not prev or not prev.get("rows"):
+        return False
+    if not entry["rows"]:
+        return True
+    return (entry["rows"] < prev["rows"]
+            or pd.Timestamp(entry["first"]) > pd.Timestamp(prev["first"])
+            or pd.Timestamp(entry["last"]) < pd.Timestamp(prev["last"]))
+
+
+def record(fp: Path, tf: str, df: pd.DataFrame | None = None,
+           prev: dict | None = None) -> dict:
+    """Validate one month file and store its entry in the dir manifest.
+    `prev`: entry of the file it replaced – lost coverage is never trusted."""
+    entry = validate(fp, tf, df)
+    if shrank(entry, prev):
+        entry["shrank"], entry["trusted"] = True, False
+    path  = fp.parent / NAME
+    with _LOCK:
+        man = dict(_load(path))
+        man[fp.stem] = entry
+        tmp = path.with_name(NAME + ".part")
+        tmp.write_text(json.dumps(man, indent=1, sort_keys=True))
+        os.replace(tmp, path)
+    return entry
+
+
+def entry(fp: Path) -> dict | None:
+    """Manifest entry of a month file if it still describes it (size + mtime)."""
+    e = _load(fp.parent / NAME).get(fp.stem)
+    if not e:
+        return None
+    st = fp.stat()
+    return e if e["size"] == st.st_size and e["mtime_ns"] == st.st_mtime_ns else None
+
+
+def is_trusted(fp: Path) -> bool:
+    """Cheap per-load check: stat + (cached) manifest lookup, no hashing."""
+    e = entry(fp)
+    return bool(e and e["trusted"])
+
+
+# ────────────────────────────────────────────────────────────────────
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("symbol")
+    ap.add_argument("--tf", default="M1")
+    ap.add_argument("--all", action="store_true",
+                    help="re-validate months whose file did not change too")
+    ap.add_argument("--fix", action="store_true",
+                    help="repair untrusted months in place, then re-validate")
+    args = ap.parse_args()
+
+    d   = DATA_ROOT / args.symbol / args.tf
+    man = _load(d / NAME)
+    for fp in sorted(d.glob("*.csv")):
+        old = man.get(fp.stem)
+        st  = fp.stat()
+        if (old and not args.all and old["size"] == st.st_size
+                and old["mtime_ns"] == st.st_mtime_ns
+                and (old["trusted"] or not args.fix)):
+            e, note = old, "unchanged"
+        else:
+            e, note = record(fp, args.tf), "checked"
+            if args.fix and not e["trusted"]:
+                note = f"repaired, {repair(fp)} rows dropped"
+                e = record(fp, args.tf)
+        flag = "trusted" if e["trusted"] else "UNTRUSTED"
+        print(f"{fp.stem}  {e['rows']:>8,} rows  dups {e['dups']:>4}  bad {e['bad_ts']:>3}  "
+              f"nan {e['nan_ohlc']:>3}  gaps {len(e['gaps']):>4} "
+              f"({e['missing_min']:,} min)  {flag:<9}  {note}")
+    return 0
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    sys.exit(main())
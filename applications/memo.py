@@ -0,0 +1,94 @@
+"""
+memo.py – content-addressed memo for backtest_wrapper results
+-------------------------------------------------------------
+A run is identified by
+    sha256(engine source) · sha256(applications/*.py) · sha256(loaded bars)
+    · canonical merged cfg
+– the engines delegate to indicators / kernels / tradebook / sessions /
+guards / exposure and the bundle is built by metrics / resultio, so an
+edit to any shared module invalidates every key.  The key maps to the
+result file it produced:
+    <results>/.memo/<key>      (one line: result file name)
+A hit is only honoured while that result file still exists.
+"""
+
+from __future__ import annotations
+import hashlib, json
+from pathlib import Path
+import pandas as pd
+
+
+_LIB = None
+
+
+def engine_hash(eng_file: str | Path) -> str:
+    return hashlib.sha256(Path(eng_file).read_bytes()).hexdigest()
+
+
+def lib_hash() -> str:
+    """sha256 over every applications/*.py source (once per process)."""
+    global _LIB
+    if _LIB is None:
+        h = hashlib.sha256()
+        for fp in sorted(Path(__file__).resolve().parent.glob("*.py")):
+            h.update(fp.name.encode()); h.update(b"\0")
+            h.update(fp.read_bytes());  h.update(b"\0")
+        _LIB = h.hexdigest()
+    return _LIB
+
+
+class BarsHash:
+    """
+    Incremental bars fingerprint: feeding the month frames one by one
+    gives the same digest as hashing their concatenation, because the
+    per-row hashes do not depend on neighbouring rows.
+    """
+    def __init__(self):
+        self._h = None
+
+    def update(self, bars: pd.DataFrame) -> None:
+        if self._h is None:
+            self._h = hashlib.sha256(",".join(map(str, bars.columns)).encode())
+        self._h.update(pd.util.hash_pandas_object(bars, index=True)
+                       .to_numpy().tobytes())
+
+    def tap(self, frames):
+        """Pass frames through unchanged while hashing them."""
+        for df in frames:
+            self.update(df)
+            yield df
+
+    def hexdigest(self) -> str:
+        return (self._h or hashlib.sha256()).hexdigest()
+
+
+def bars_fingerprint(bars: pd.DataFrame) -> str:
+    """Hash of index + values + column names (row order matters)."""
+    h = BarsHash()
+    h.update(bars)
+    return h.hexdigest()
+
+
+def canonical_cfg(cfg: dict) -> str:
+    return json.dumps(cfg, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def run_key(eng_file: str | Path, bars_fp: str, cfg: dict) -> str:
+    h = hashlib.sha256()
+    for part in (engine_hash(eng_file), lib_hash(), bars_fp, canonical_cfg(cfg)):
+        h.update(part.encode()); h.update(b"\0")
+    return h.hexdigest()
+
+
+def lookup(res_dir: Path, key: str) -> Path | None:
+    entry = res_dir / ".memo" / key
+    if not entry.is_file():
+        return None
+    hit = res_dir / entry.read_text().strip()
+    return hit if hit.is_file() else None
+
+
+def store(res_dir: Path, key: str, out_path: Path) -> None:
+    memo_dir = res_dir / ".memo"
+    memo_dir.mkdir(parents=True, exist_ok=True)
+    (memo_dir / key).write_text(out_path.name)
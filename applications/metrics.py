@@ -10,6 +10,8 @@ from typing import List, Dict
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from applications import exposure, perf
+from applications.tradebook import isoformat
 
 
 # ───────────────────────── internal ──────────────────────────
@@ -29,7 +31,45 @@ def _png_from_equity(eq: List[dict]) -> str | None:
     return base64.b64encode(buf.getvalue()).decode()
 
 
+def _records(trade_log: pd.DataFrame) -> List[dict]:
+    """trade_log rows as dicts, datetime columns already ISO strings."""
+    ts_cols = trade_log.select_dtypes(include=["datetime", "datetimetz"]).columns
+    return trade_log.assign(**{c: isoformat(pd.DatetimeIndex(trade_log[c]))
+                               for c in ts_cols}).to_dict(orient="records")
+
+
 # ───────────────────────── public API ────────────────────────
+def streaks(pips) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row (win_streak_max, loss_streak_max) of a (n, trades) pips
+    matrix (1-D: one row).
+
+    The bundle's counter rule: a win after a loss starts over at 1, a
+    0-pip trade resets to 0, but a loss continues the count of the run
+    before it – W W L L is a losing streak of 4.
+    """
+    p = np.atleast_2d(np.asarray(pips, dtype=float))
+    n, k = p.shape
+    if not k:
+        z = np.zeros(n, dtype=int)
+        return z, z
+    idx  = np.arange(k)
+    win  = p > 0
+    prev = np.c_[np.zeros((n, 1), dtype=bool), win[:, :-1]]
+    zero = np.c_[np.ones((n, 1), dtype=bool), p[:, :-1] == 0]   # start / after a 0
+    run  = lambda flag: idx - np.maximum.accumulate(np.where(flag, idx, 0), axis=1) + 1
+    w    = np.where(win, run(~prev | zero), 0)            # consecutive wins
+    l    = np.where(p < 0, run((win & ~prev) | zero), 0)  # since a run's first win
+    return w.max(axis=1), l.max(axis=1)
+
+
+def drawdown(equity) -> np.ndarray:
+    """Per-row max(cummax − equity) of an equity matrix (1-D: one row)."""
+    eq = np.atleast_2d(np.asarray(equity, dtype=float))
+    if not eq.shape[1]:
+        return np.zeros(len(eq))
+    return (np.maximum.accumulate(eq, axis=1) - eq).max(axis=1)
+
+
 def generate_backtest_output(trade_log: pd.DataFrame,
                              equity_curve: List[dict],
                              params: dict,
@@ -37,7 +77,7 @@ def generate_backtest_output(trade_log: pd.DataFrame,
     """
     Build the result-bundle consumed by dashboards and audit tools.
     `trade_log` must include columns:
-        ['pips','entry_time','exit_time','side','reason']
+        ['pips','entry_time','exit_time','reason']   (side, layer optional)
     """
     pnl = trade_log["pips"]
     wins, losses = pnl[pnl > 0], pnl[pnl < 0]
@@ -49,22 +89,19 @@ def generate_backtest_output(trade_log: pd.DataFrame,
     mean_hits  = (trade_log.reason == "mean").sum()
 
     # ---------- streak calc ----------
-    signs = np.sign(pnl)
-    win_streak = loss_streak = cur = 0
-    for s in signs:
-        if   s > 0: cur =  max(1, cur + 1)
-        elif s < 0: cur = -max(1, abs(cur) + 1)
-        else:       cur = 0
-        win_streak  = max(win_streak,  cur)
-        loss_streak = min(loss_streak, cur)
-    loss_streak = abs(loss_streak)
+    (win_streak,), (loss_streak,) = streaks(pnl.to_numpy())
 
     # ---------- simultaneous trades ----------
-    sim = trade_log.entry_time.dt.floor("T").value_counts()
-    gt1 = (sim > 1).sum()
-    max_sim = sim.max() if not sim.empty else 0
+    tl = trade_log.attrs.get("exposure")      # per-bar timeline, if the engine
+    if tl is not None:                        # ran with cfg["exposure"]
+        gt1, max_sim = (tl.tickets > 1).sum(), tl.tickets.max() if len(tl) else 0
+    else:                                     # approximation: same-minute entries
+        sim = trade_log.entry_time.dt.floor("min").value_counts()
+        gt1 = (sim > 1).sum()
+        max_sim = sim.max() if not sim.empty else 0
 
-    png_b64 = _png_from_equity(equity_curve)
+    with perf.phase("png"):
+        png_b64 = _png_from_equity(equity_curve)
 
     out = {
         "engine"        : engine_file,
@@ -80,8 +117,7 @@ def generate_backtest_output(trade_log: pd.DataFrame,
         "sharpe"        : round(float(pnl.mean() / pnl.std()), 2)
                            if pnl.std() > 0 else None,
         "max_dd_pips"   : round(float(
-                            (pd.Series([e["equity"] for e in equity_curve]).cummax()
-                             - pd.Series([e["equity"] for e in equity_curve])).max()), 2)
+                            drawdown([e["equity"] for e in equity_curve])[0]), 2)
                            if equity_curve else None,
         "#_stop_hits"   : int(stop_hits),
         "stop_hit_%"    : round(stop_hits / tot_hits * 100, 1) if tot_hits else None,
@@ -97,6 +133,13 @@ def generate_backtest_output(trade_log: pd.DataFrame,
         "win_streak_max" : int(win_streak),
         "loss_streak_max": int(loss_streak),
         "equity_curve_png": png_b64,
-        "trade_log"       : trade_log.to_dict(orient="records"),
+        "trade_log"       : _records(trade_log),
     }
+    if tl is not None:
+        out["exposure"] = {**exposure.summary(tl), "timeline": {
+            "ts": isoformat(tl.index),
+            **{c: tl[c].round(2).to_numpy() for c in exposure.COLS}}}
+    # engine-side diagnostics riding on the trade log (e.g. entry_guards)
+    for k, v in trade_log.attrs.items():
+        out.setdefault(k, v)
     return out
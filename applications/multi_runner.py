@@ -0,0 +1,132 @@
+"""
+multi_runner.py – several engines over one shared bar feed
+----------------------------------------------------------
+CLI example:
+    python applications/multi_runner.py \
+           --engines 001/v5.0/engines/mr_v5_0,001/v6.0/engines/mr_v6_0,001/v6.02 \
+           --from 2025-03-01 --to 2025-03-31 --params drift=0.0005 --jobs 3
+
+Bars are loaded once and the shared σ-MR indicator bank and default
+block (applications/indicators.py) are computed once, before the pool
+forks, so every worker inherits them instead of recomputing them.  Each engine
+still gets its own result bundle (memoised exactly like
+backtest_wrapper), and one comparison table covers them all.
+
+Writes:
+    <engine folder>/results/<UTC-timestamp>.txt          one per engine
+    <ROOT>/results/compare_<UTC-timestamp>.json          side-by-side
+Echoes one "JSON:" line per engine, then one for the comparison.
+"""
+
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse, json, datetime
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from applications import indicators, memo, registry, resultio
+from applications.metrics import generate_backtest_output
+from applications.backtest_wrapper import (ENGINE_ROOT, TF_CHOICES, load_bars,
+                                           load_engine, parse_params,
+                                           write_result)
+
+# columns of the comparison table (keys of the metrics bundle)
+COMPARE_COLS = ["trades", "win_%", "expect_pips", "total_pips",
+                "profit_factor", "sharpe", "max_dd_pips",
+                "stop_hit_%", "time_hit_%", "mean_hit_%"]
+
+# ── shared state, set in the parent and inherited by forked workers ─
+_BARS    = None
+_BARS_FP = None
+
+
+def _run_one(job):
+    """One engine over the shared bars → (engine_id, result path, bundle)."""
+    engine_id, overrides, force = job
+    engine  = load_engine(engine_id)
+    cfg     = {**registry.default_cfg(engine), **overrides}
+    res_dir = engine.ENGINE_SPEC.root / "results"
+    key     = memo.run_key(engine.__file__, _BARS_FP, cfg)
+    hit     = None if force else memo.lookup(res_dir, key)
+    if hit is not None:
+        return engine_id, hit, resultio.read(hit)
+
+    trade_log, equity = registry.run(engine, _BARS, cfg)
+    results  = generate_backtest_output(trade_log, equity, cfg,
+                                        engine_file=engine_id)
+    out_path = write_result(res_dir, results)
+    memo.store(res_dir, key, out_path)
+    return engine_id, out_path, results
+
+
+def compare_table(rows: list) -> str:
+    """Markdown table, one row per engine."""
+    head = "| engine | " + " | ".join(COMPARE_COLS) + " |"
+    sep  = "|---" * (len(COMPARE_COLS) + 1) + "|"
+    body = ["| " + r["engine"] + " | "
+            + " | ".join("—" if r.get(c) is None else str(r[c])
+                         for c in COMPARE_COLS) + " |"
+            for r in rows]
+    return "\n".join([head, sep, *body])
+
+
+def run_all(engine_ids: list, bars, overrides: dict,
+            jobs: int = 1, force: bool = False) -> list:
+    global _BARS, _BARS_FP
+    _BARS, _BARS_FP = bars, memo.bars_fingerprint(bars)
+
+    # load every engine + the default indicator block once, pre-fork
+    for eid in engine_ids:
+        load_engine(eid)
+    indicators.mr_indicators(_BARS)
+
+    work = [(eid, overrides, force) for eid in engine_ids]
+    if jobs and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 mp_context=mp.get_context("fork")) as pool:
+            return list(pool.map(_run_one, work))
+    return [_run_one(w) for w in work]
+
+
+# ────────────────────────────────────────────────────────────────────
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--engines", required=True,
+                    help="comma list, e.g. 001/v5.0/engines/mr_v5_0,001/v6.02")
+    ap.add_argument("--from", dest="start", required=True)
+    ap.add_argument("--to",   dest="end",   required=True)
+    ap.add_argument("--symbol", default="EURGBP")
+    ap.add_argument("--tf",     choices=TF_CHOICES, default="M1")
+    ap.add_argument("--params", type=str,
+                    help="overrides applied to every engine")
+    ap.add_argument("--jobs",  type=int, default=1)
+    ap.add_argument("--force", action="store_true")
+    args = ap.parse_args()
+
+    engine_ids = [e.strip() for e in args.engines.split(",") if e.strip()]
+    bars = load_bars(args.symbol, args.start, args.end, tf=args.tf)
+    done = run_all(engine_ids, bars, parse_params(args.params),
+                   jobs=args.jobs, force=args.force)
+
+    rows = []
+    for engine_id, path, res in done:
+        print("JSON:", path.relative_to(ENGINE_ROOT))
+        rows.append({"engine": engine_id, "result": str(path.relative_to(ENGINE_ROOT)),
+                     **{c: res.get(c) for c in COMPARE_COLS}})
+    print(compare_table(rows))
+
+    out_dir  = ROOT / "results"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp    = datetime.datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
+    out_path = out_dir / f"compare_{stamp}.json"
+    out_path.write_text(json.dumps({
+        "symbol": args.symbol, "from": args.start, "to": args.end,
+        "tf": args.tf, "params": parse_params(args.params), "engines": rows,
+    }, indent=2, default=str))
+    print("JSON:", out_path.relative_to(ROOT))
+    return 0
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    sys.exit(main())
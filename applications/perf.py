@@ -0,0 +1,125 @@
+"""
+perf.py – per-run phase timings and counters
+--------------------------------------------
+    from applications import perf
+    rec = perf.start()
+    with perf.phase("loop"):
+        ...
+    perf.count("bars", len(df))
+    perf.event("month", month="2025-03", source="cache", rows=30_396)
+    bundle["perf"] = perf.stop()
+
+Everything is a no-op while no recorder is active, and the hooks sit
+around whole phases / months only (never per bar), so the cost is a
+handful of perf_counter() calls per run.  Safe to call from the
+iter_bars prefetch threads.
+
+While tracemalloc is tracing (backtest_wrapper --profile) each phase
+also records its peak allocation above what was live on entry, in KiB;
+nested phases hand their peak up to the enclosing one.
+"""
+
+from __future__ import annotations
+import threading, tracemalloc
+from time import perf_counter
+
+_ACTIVE = None
+
+
+class Recorder:
+    def __init__(self):
+        self.t0       = perf_counter()
+        self.phases   = {}
+        self.counters = {}
+        self.events   = []
+        self.mem      = {}               # phase → peak KiB above entry
+        self.mem_open = []               # [[live_at_entry, peak_so_far], …]
+        self.lock     = threading.Lock()
+
+    def add(self, name: str, secs: float) -> None:
+        with self.lock:
+            self.phases[name] = self.phases.get(name, 0.0) + secs
+
+    def mem_enter(self) -> None:
+        cur, peak = tracemalloc.get_traced_memory()
+        if self.mem_open:
+            top = self.mem_open[-1]
+            top[1] = max(top[1], peak)
+        tracemalloc.reset_peak()
+        self.mem_open.append([cur, cur])
+
+    def mem_exit(self, name: str) -> None:
+        _, peak = tracemalloc.get_traced_memory()
+        base, top = self.mem_open.pop()
+        top = max(top, peak)
+        if self.mem_open:
+            self.mem_open[-1][1] = max(self.mem_open[-1][1], top)
+        tracemalloc.reset_peak()
+        kib = round((top - base) / 1024, 1)
+        self.mem[name] = max(self.mem.get(name, 0.0), kib)
+
+    def report(self) -> dict:
+        with self.lock:
+            out = {
+                "total_s":  round(perf_counter() - self.t0, 4),
+                "phases_s": {k: round(v, 4) for k, v in self.phases.items()},
+                "counters": dict(self.counters),
+                "events":   list(self.events),
+            }
+            if self.mem:
+                out["mem_peak_kib"] = dict(self.mem)
+            return out
+
+
+class phase:
+    """Context manager adding wall time to the active recorder."""
+    __slots__ = ("name", "rec", "t", "mem")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.rec = _ACTIVE
+        if self.rec is not None:
+            self.mem = tracemalloc.is_tracing()
+            if self.mem:
+                self.rec.mem_enter()
+            self.t = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.rec is not None:
+            self.rec.add(self.name, perf_counter() - self.t)
+            if self.mem and tracemalloc.is_tracing():
+                self.rec.mem_exit(self.name)
+        return False
+
+
+def start() -> Recorder:
+    global _ACTIVE
+    _ACTIVE = Recorder()
+    return _ACTIVE
+
+
+def stop() -> dict | None:
+    global _ACTIVE
+    rec, _ACTIVE = _ACTIVE, None
+    return rec.report() if rec is not None else None
+
+
+def active() -> bool:
+    return _ACTIVE is not None
+
+
+def count(name: str, n: int = 1) -> None:
+    rec = _ACTIVE
+    if rec is not None:
+        with rec.lock:
+            rec.counters[name] = rec.counters.get(name, 0) + n
+
+
+def event(kind: str, **fields) -> None:
+    rec = _ACTIVE
+    if rec is not None:
+        with rec.lock:
+            rec.events.append({"kind": kind, **fields})
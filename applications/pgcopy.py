@@ -0,0 +1,83 @@
+"""
+pgcopy.py – constant-memory Postgres pulls (tick months)
+--------------------------------------------------------
+    n = copy_to_csv(PG_DSN, sql, params, DATA_ROOT / "EURUSD/tick/2025-03.csv")
+    for chunk in iter_batches(PG_DSN, sql, params):      # DataFrames
+        ...
+
+copy_to_csv wraps the SELECT in `COPY (…) TO STDOUT WITH CSV HEADER` and
+lets psycopg2 stream the server's output straight into the file – no
+Python tuples, no DataFrame, no CSV string.  It writes <file>.part and
+renames on success, so an interrupted pull never leaves a truncated
+month in the cache; a pull that returns no rows leaves `fp` untouched.
+
+iter_batches uses a named (server-side) cursor and yields BATCH_ROWS-row
+DataFrames, for callers that want frames but not the month-sized tuple
+list pd.read_sql builds first.
+
+Both run the session with TimeZone=UTC, so COPY writes timestamps as
+"2025-03-02 22:00:00.123+00" – read_csv(parse_dates=…) gives UTC back.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterator
+import os
+
+import pandas as pd
+import psycopg2
+
+from applications.bars_sql import PG_OPTIONS
+
+BATCH_ROWS = 100_000
+
+
+class _LineCount:
+    """File wrapper counting newlines as COPY writes through it."""
+    def __init__(self, fh):
+        self.fh, self.lines = fh, 0
+
+    def write(self, data):
+        self.lines += data.count(b"\n" if isinstance(data, bytes) else "\n")
+        return self.fh.write(data)
+
+
+def copy_to_csv(dsn: str, sql: str, params: list, fp: Path) -> int:
+    """Stream the query result into `fp` (CSV with header); rows written."""
+    fp.parent.mkdir(parents=True, exist_ok=True)
+    part = fp.with_name(fp.name + ".part")
+    try:
+        with psycopg2.connect(dsn, options=PG_OPTIONS) as con, \
+             con.cursor() as cur, open(part, "wb") as fh:
+            query = cur.mogrify(sql.strip(), params).decode()
+            out   = _LineCount(fh)
+            cur.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", out)
+        n = max(out.lines - 1, 0)
+        if n:                                # empty result: fp stays as it was
+            os.replace(part, fp)
+    finally:
+        part.unlink(missing_ok=True)
+    return n
+
+
+def iter_batches(dsn: str, sql: str, params: list,
+                 batch: int = BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    with psycopg2.connect(dsn, options=PG_OPTIONS) as con:
+        with con.cursor(name="pgcopy_stream") as cur:
+            cur.itersize = batch
+            cur.execute(sql, params)
+            first = True
+            while True:
+                rows = cur.fetchmany(batch)
+                if rows or first:           # an empty result still has columns
+                    cols = [d[0] for d in cur.description]
+                    yield pd.DataFrame.from_records(rows, columns=cols)
+                if len(rows) < batch:
+                    break
+                first = False
+
+
+def read_batches(dsn: str, sql: str, params: list,
+                 batch: int = BATCH_ROWS) -> pd.DataFrame:
+    """iter_batches glued into one frame (empty frame keeps the columns)."""
+    return pd.concat(iter_batches(dsn, sql, params, batch), ignore_index=True)
@@ -0,0 +1,116 @@
+"""
+profiler.py – sampling profiler behind backtest_wrapper --profile
+-----------------------------------------------------------------
+    prof = profiler.Sampler(interval=0.001).start()   # samples this thread
+    ...                                               # run engine + metrics
+    prof.stop()
+    bundle["profile"] = prof.summary()
+    prof.write(out_path)          # <stamp>.collapsed  +  <stamp>.top.txt
+
+A daemon thread grabs the target thread's Python stack every `interval`
+seconds (sys._current_frames), so engine copies need no hand
+instrumentation and the run itself pays only the GIL hand-offs.  The
+switch interval is lowered to `interval` while sampling so the sampler
+actually gets scheduled inside long pandas calls.
+
+<stamp>.collapsed is one "root;…;leaf <samples>" line per distinct stack
+(flamegraph.pl / speedscope / inferno input).  Frames are labelled
+"<file>:<qualname>" with the file relative to the project root, or to
+site-packages for library code, e.g.
+    templates/mr_core.py:run_backtest_stream;pandas/core/indexing.py:_LocIndexer.__getitem__
+<stamp>.top.txt ranks functions by self samples and shows inclusive
+(total) samples alongside.
+"""
+
+from __future__ import annotations
+import sys, threading
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _label(code, _cache={}) -> str:
+    lab = _cache.get(code)
+    if lab is None:
+        fn = code.co_filename
+        if "site-packages/" in fn:
+            fn = fn.rsplit("site-packages/", 1)[1]
+        elif fn.startswith(str(ROOT)):
+            fn = fn[len(str(ROOT)) + 1:]
+        else:
+            fn = Path(fn).name
+        lab = _cache[code] = f"{fn}:{getattr(code, 'co_qualname', code.co_name)}"
+    return lab
+
+
+class Sampler:
+    def __init__(self, interval: float = 0.001, thread_id: int | None = None):
+        self.interval = interval
+        self.tid      = thread_id or threading.get_ident()
+        self.stacks   = Counter()              # (root, …, leaf) code tuples
+        self.samples  = 0
+        self._halt    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, daemon=True,
+                                         name="profiler")
+
+    # ── sampling ────────────────────────────────────────────────────
+    def _run(self) -> None:
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.tid)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self) -> "Sampler":
+        self._switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch, self.interval))
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Sampler":
+        self._halt.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch)
+        return self
+
+    # ── output ──────────────────────────────────────────────────────
+    def collapsed(self) -> list:
+        lines = Counter()
+        for stack, n in self.stacks.items():
+            lines[";".join(_label(c) for c in stack)] += n
+        return [f"{k} {v}" for k, v in sorted(lines.items())]
+
+    def top(self, n: int = 25) -> list:
+        own, total = Counter(), Counter()
+        for stack, k in self.stacks.items():
+            labels = [_label(c) for c in stack]
+            own[labels[-1]] += k
+            for lab in set(labels):
+                total[lab] += k
+        s = self.samples or 1
+        return [{"function": f, "self": c, "self_%": round(100 * c / s, 1),
+                 "total": total[f], "total_%": round(100 * total[f] / s, 1)}
+                for f, c in own.most_common(n)]
+
+    def summary(self, n: int = 10) -> dict:
+        return {"samples": self.samples,
+                "interval_ms": round(self.interval * 1e3, 3),
+                "top": self.top(n)}
+
+    def write(self, out_path: Path, n: int = 40) -> tuple:
+        """Collapsed stacks + top-N table next to the result file."""
+        stem   = out_path.with_suffix("")
+        folded = stem.with_suffix(".collapsed")
+        table  = stem.with_suffix(".top.txt")
+        folded.write_text("\n".join(self.collapsed()) + "\n")
+        rows = [f"{self.samples} samples @ {self.interval * 1e3:g} ms",
+                f"{'self':>7} {'self%':>6} {'total':>7} {'total%':>6}  function"]
+        rows += [f"{r['self']:>7} {r['self_%']:>6} {r['total']:>7} "
+                 f"{r['total_%']:>6}  {r['function']}" for r in self.top(n)]
+        table.write_text("\n".join(rows) + "\n")
+        return folded, table
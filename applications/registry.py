@@ -0,0 +1,241 @@
+"""
+registry.py – engine discovery, cached loading, declared capabilities
+---------------------------------------------------------------------
+Any module under 001/ or 002/ with a top-level `run_backtest` or
+`backtest` function plus a PARAM_SCHEMA or CFG literal is an engine.
+Discovery only parses the source (ast) – the one-off v5.x scripts that
+do work at import time are never executed.
+
+Engine ids are paths relative to ENGINE_ROOT:
+    001/v6.02                      → 001/v6.02/engine.py
+    001/v6.0/engines/mr_v6_0       → 001/v6.0/engines/mr_v6_0.py
+    templates/mr_core              (explicit paths outside 001/002 work too)
+
+Per engine the registry records
+    entry         run_backtest | backtest
+    returns       tuple | dict | series   (RETURNS = "..." overrides)
+    param_schema  PARAM_SCHEMA literal
+    cfg           CFG literal
+    capabilities  CAPABILITIES literal ∪ hooks found (run_batch → batch,
+                  run_fast → accelerated, run_backtest_stream → stream)
+
+Compiled modules are cached per file and re-executed only when the
+file's mtime changes, so multi-engine runs load each engine once.
+
+CLI:
+    python applications/registry.py          # table of discovered engines
+"""
+
+from __future__ import annotations
+import ast, importlib.util, re, sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+import pandas as pd
+
+ROOT        = Path(__file__).resolve().parent.parent
+ENGINE_ROOT = ROOT
+SEARCH_DIRS = ("001", "002")
+
+ENTRY_POINTS    = ("run_backtest", "backtest")
+CAPABILITY_HOOKS = {"run_batch": "batch", "run_fast": "accelerated",
+                    "run_backtest_stream": "stream"}
+REQUIRED_COLS   = ["pips", "entry_time", "exit_time", "reason"]   # what metrics reads
+
+
+@dataclass
+class EngineSpec:
+    id:           str
+    path:         Path
+    entry:        str
+    returns:      str
+    param_schema: dict = field(default_factory=dict)
+    cfg:          dict = field(default_factory=dict)
+    capabilities: set  = field(default_factory=set)
+
+    @property
+    def root(self) -> Path:
+        """Folder the engine's results/ lives in."""
+        return self.path.parent
+
+
+# ───────────────────────── static inspection ─────────────────────────
+def _literal(tree: ast.Module, name: str):
+    for node in tree.body:
+        tgt = node.targets[0] if isinstance(node, ast.Assign) else \
+              node.target if isinstance(node, ast.AnnAssign) else None
+        if isinstance(tgt, ast.Name) and tgt.id == name and node.value is not None:
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                return None
+    return None
+
+
+def _returns(fn: ast.FunctionDef, defs: Dict[str, ast.FunctionDef],
+             seen=()) -> str:
+    """Classify what `fn` returns from its return statements."""
+    for node in ast.walk(fn):
+        if not isinstance(node, ast.Return) or node.value is None:
+            continue
+        v = node.value
+        if isinstance(v, ast.Tuple):
+            return "tuple"
+        if isinstance(v, ast.Dict):
+            return "dict"
+        if isinstance(v, ast.Call):
+            callee = v.func.attr if isinstance(v.func, ast.Attribute) else \
+                     v.func.id   if isinstance(v.func, ast.Name) else None
+            if callee == "Series":
+                return "series"
+            if callee in defs and callee not in seen:
+                return _returns(defs[callee], defs, seen + (fn.name,))
+    ann = ast.unparse(fn.returns) if fn.returns is not None else ""
+    for key, kind in (("tuple", "tuple"), ("Series", "series"), ("dict", "dict")):
+        if key in ann:
+            return kind
+    return "unknown"
+
+
+def inspect_file(path: Path, engine_id: str | None = None) -> EngineSpec | None:
+    """Parse one file; None when it is not an engine module."""
+    try:
+        tree = ast.parse(path.read_text(), filename=str(path))
+    except (SyntaxError, UnicodeDecodeError):
+        return None
+    defs  = {n.name: n for n in tree.body if isinstance(n, ast.FunctionDef)}
+    entry = next((e for e in ENTRY_POINTS if e in defs), None)
+    schema, cfg = _literal(tree, "PARAM_SCHEMA"), _literal(tree, "CFG")
+    if entry is None or (schema is None and cfg is None):
+        return None
+    caps = set(_literal(tree, "CAPABILITIES") or ())
+    caps |= {cap for hook, cap in CAPABILITY_HOOKS.items() if hook in defs}
+    if engine_id is None:
+        rel = path.relative_to(ENGINE_ROOT)
+        engine_id = str(rel.parent if path.name == "engine.py"
+                        else rel.with_suffix(""))
+    return EngineSpec(id=engine_id, path=path, entry=entry,
+                      returns=_literal(tree, "RETURNS") or _returns(defs[entry], defs),
+                      param_schema=schema or {}, cfg=cfg or {},
+                      capabilities=caps)
+
+
+# ───────────────────────── discovery + cache ─────────────────────────
+_SPECS:   Dict[Path, Tuple[int, EngineSpec | None]] = {}
+_MODULES: Dict[Path, Tuple[int, object]] = {}
+
+
+def _spec_for(path: Path, engine_id: str | None = None) -> EngineSpec | None:
+    mtime = path.stat().st_mtime_ns
+    hit = _SPECS.get(path)
+    if hit is None or hit[0] != mtime:
+        hit = _SPECS[path] = (mtime, inspect_file(path, engine_id))
+    return hit[1]
+
+
+def discover(dirs=SEARCH_DIRS) -> List[EngineSpec]:
+    out = []
+    for d in dirs:
+        for path in sorted((ENGINE_ROOT / d).rglob("*.py")):
+            spec = _spec_for(path.resolve())
+            if spec is not None:
+                out.append(spec)
+    return out
+
+
+def resolve(engine_id: str) -> EngineSpec:
+    base = ENGINE_ROOT / engine_id
+    for cand in (base / "engine.py", base.with_suffix(".py"), base):
+        if cand.is_file():
+            spec = _spec_for(cand.resolve(), engine_id.removesuffix(".py"))
+            if spec is None:
+                raise ValueError(f"not an engine module: {cand}")
+            return spec
+    raise FileNotFoundError(f"Engine file not found: {base}")
+
+
+def load(engine_id: str):
+    """Import (or reuse) the engine module; re-exec only on mtime change."""
+    spec  = resolve(engine_id)
+    mtime = spec.path.stat().st_mtime_ns
+    hit   = _MODULES.get(spec.path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    name = "engine_" + re.sub(r"\W", "_", spec.id)
+    mod_spec = importlib.util.spec_from_file_location(name, spec.path)
+    mod = importlib.util.module_from_spec(mod_spec)
+    mod_spec.loader.exec_module(mod)
+    mod.ENGINE_SPEC = spec
+    _MODULES[spec.path] = (mtime, mod)
+    return mod
+
+
+# ───────────────────────── uniform call ──────────────────────────────
+def schema_defaults(schema: dict) -> dict:
+    """PARAM_SCHEMA → {key: default}; accepts {"default": x} or bare x."""
+    return {k: (v["default"] if isinstance(v, dict) else v)
+            for k, v in schema.items()}
+
+
+def default_cfg(engine) -> dict:
+    """Schema defaults overlaid with the engine's CFG."""
+    return {**schema_defaults(getattr(engine, "PARAM_SCHEMA", None) or {}),
+            **getattr(engine, "CFG", {})}
+
+
+def normalise(ret) -> Tuple[pd.DataFrame, List[dict]]:
+    """Any engine return contract → (trade_log, equity_list)."""
+    equity = None
+    if isinstance(ret, tuple):
+        ret, rest = ret[0], ret[1:]
+        if rest and isinstance(rest[0], list):
+            equity = rest[0]
+    if isinstance(ret, dict):
+        rows = ret.get("trade_log")
+        if rows is not None:
+            ret = pd.DataFrame(rows)
+        else:
+            ret = pd.Series([float(x) for x in ret.get("csv", "").split()],
+                            name="pips")
+    trade_log = ret if isinstance(ret, pd.DataFrame) else \
+                pd.DataFrame({"pips": pd.Series(ret, dtype=float).to_numpy()})
+
+    # columns the engine logged are coerced; of the rest only the ones
+    # metrics needs are added (side / layer stay absent, not null)
+    trade_log = trade_log.copy()
+    for col in REQUIRED_COLS:
+        if col not in trade_log:
+            trade_log[col] = (pd.Series(pd.NaT, index=trade_log.index,
+                                        dtype="datetime64[ns, UTC]")
+                              if col.endswith("_time") else None)
+        elif col.endswith("_time") and trade_log[col].dtype == object:
+            trade_log[col] = pd.to_datetime(trade_log[col], utc=True,
+                                            format="ISO8601")
+    trade_log["pips"] = trade_log["pips"].astype(float)
+
+    if equity is None:
+        bal = trade_log["pips"].cumsum().tolist()
+        ts  = [t.isoformat() if pd.notna(t) else i
+               for i, t in enumerate(trade_log["exit_time"])]
+        equity = [{"ts": t, "equity": b} for t, b in zip(ts, bal)]
+    return trade_log, equity
+
+
+def run(engine, df: pd.DataFrame, cfg: dict) -> Tuple[pd.DataFrame, List[dict]]:
+    """Call the engine's entry point and normalise its result."""
+    spec = engine.ENGINE_SPEC
+    return normalise(getattr(engine, spec.entry)(df, cfg))
+
+
+def run_stream(engine, frames, cfg: dict) -> Tuple[pd.DataFrame, List[dict]]:
+    """Feed an iterable of bar chunks to a "stream"-capable engine."""
+    return normalise(engine.run_backtest_stream(frames, cfg))
+
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    for s in discover():
+        print(f"{s.id:<32} {s.entry:<13} {s.returns:<7} "
+              f"{','.join(sorted(s.capabilities)) or '-':<12} "
+              f"{','.join(s.param_schema) or '-'}")
+    sys.exit(0)
@@ -0,0 +1,96 @@
+"""
+resample.py – higher-timeframe bars derived from the M1 cache
+-------------------------------------------------------------
+One M1 month in → every TF in TF_MINUTES out, in a single pass over the
+sorted minute arrays (bucket keys + ufunc.reduceat, no groupby).
+
+Derived months live in the usual cache layout
+    <DATA_ROOT>/<symbol>/<tf>/<YYYY-MM>.csv
+next to a "<YYYY-MM>.src" sidecar holding the size+mtime of the M1 file
+they were built from.  When the M1 month is re-exported the signature no
+longer matches and the derived month is rebuilt on next access.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, Iterable
+import numpy as np
+import pandas as pd
+
+# ---- TFs served from M1 (bucket width in minutes, epoch-aligned) -----------
+TF_MINUTES: Dict[str, int] = {
+    "M5":  5,
+    "M15": 15,
+    "M30": 30,
+    "H1":  60,
+    "H4":  240,
+}
+
+# …plus M1 itself, for bucketing ticks (bars_sql.bucket_ticks)
+ALL_MINUTES: Dict[str, int] = {"M1": 1, **TF_MINUTES}
+
+_NS_PER_MIN = 60 * 1_000_000_000
+
+
+# ───────────────────────── cache bookkeeping ─────────────────────────
+def source_sig(src: Path) -> str:
+    st = src.stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def is_fresh(fp_csv: Path, src: Path) -> bool:
+    """True when `fp_csv` exists and was built from the current `src`."""
+    side = fp_csv.with_suffix(".src")
+    if not (fp_csv.is_file() and side.is_file() and src.is_file()):
+        return False
+    return side.read_text().strip() == source_sig(src)
+
+
+# ───────────────────────── resampler ─────────────────────────────────
+def resample_ohlc(m1: pd.DataFrame,
+                  tfs: Iterable[str] = TF_MINUTES) -> Dict[str, pd.DataFrame]:
+    """
+    Aggregate sorted M1 rows (column `timestamp_utc`, tz-aware UTC) into
+    OHLC bars for every TF in `tfs`.  Bars are labelled with their bucket
+    start (left-closed, left-labelled – same as `DataFrame.resample`).
+    """
+    out = {}
+    if m1.empty:
+        for tf in tfs:
+            out[tf] = m1.iloc[:0].copy()
+        return out
+
+    ts  = m1["timestamp_utc"].to_numpy(dtype="datetime64[ns]").view("i8")
+    o   = m1["open"].to_numpy(float)
+    h   = m1["high"].to_numpy(float)
+    l   = m1["low"].to_numpy(float)
+    c   = m1["close"].to_numpy(float)
+    vol = m1["volume"].to_numpy() if "volume" in m1 else None
+
+    for tf in tfs:
+        width  = ALL_MINUTES[tf] * _NS_PER_MIN
+        key    = ts // width
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        ends   = np.r_[starts[1:], len(key)] - 1
+        cols = {
+            "timestamp_utc": pd.to_datetime(key[starts] * width, utc=True),
+            "open":  o[starts],
+            "high":  np.maximum.reduceat(h, starts),
+            "low":   np.minimum.reduceat(l, starts),
+            "close": c[ends],
+        }
+        if vol is not None:
+            cols["volume"] = np.add.reduceat(vol, starts)
+        out[tf] = pd.DataFrame(cols)
+    return out
+
+
+def write_derived(frames: Dict[str, pd.DataFrame], sym_root: Path,
+                  ym: str, src: Path) -> None:
+    """Store each derived month under <sym_root>/<tf>/ plus its sidecar."""
+    sig = source_sig(src)
+    for tf, df in frames.items():
+        fp = sym_root / tf / f"{ym}.csv"
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(fp, index=False, date_format="%Y-%m-%dT%H:%M:%SZ")
+        fp.with_suffix(".src").write_text(sig)
@@ -0,0 +1,98 @@
+"""
+resultio.py – compact result-bundle writer / reader
+---------------------------------------------------
+    from applications import resultio
+    resultio.write(res_dir / "2025-06-01_120000.txt", bundle)        # plain
+    resultio.write(res_dir / "2025-06-01_120000.json.gz", bundle)    # gzip
+    bundle = resultio.read(path)           # .txt / .json / .json.gz / .json.gz.b64
+    trades = resultio.trades_frame(bundle) # trade_log → DataFrame, UTC times
+
+Writing
+    • compact separators, no indent
+    • datetimes / Timestamps → ISO-8601 ("2025-03-03T08:31:00+00:00"),
+      NaT → null, NumPy scalars / arrays → plain numbers / lists
+    • streamed: each top-level value is encoded with the C encoder and
+      written straight to the (optionally gzip) file handle; long lists
+      such as trade_log go out in TRADE_CHUNK-record slices, so the whole
+      bundle never sits in memory as one string
+    • gzip is chosen by a ".gz" suffix
+
+Reading
+    The gzip layer is detected from the magic bytes, and the legacy
+    OLD-results/*.json.gz.b64 artefacts (base64 over gzip) are unwrapped
+    too, so dashboards can point read() at any result file.
+"""
+
+from __future__ import annotations
+import base64, datetime as _dt, gzip, json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TRADE_CHUNK = 10_000
+_ENC = json.JSONEncoder(separators=(",", ":"), default=lambda o: _native(o))
+
+
+def _native(o):
+    if o is pd.NaT:
+        return None
+    if isinstance(o, (_dt.datetime, _dt.date)):
+        return o.isoformat()
+    if isinstance(o, np.integer):
+        return int(o)
+    if isinstance(o, np.floating):
+        return float(o)
+    if isinstance(o, np.bool_):
+        return bool(o)
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.datetime64):
+        return None if np.isnat(o) else str(o)
+    return str(o)
+
+
+def _chunks(results: dict):
+    yield "{"
+    for i, (k, v) in enumerate(results.items()):
+        yield ("," if i else "") + _ENC.encode(str(k)) + ":"
+        if isinstance(v, list) and len(v) > TRADE_CHUNK:
+            yield "["
+            for j in range(0, len(v), TRADE_CHUNK):
+                yield ("," if j else "") + _ENC.encode(v[j:j + TRADE_CHUNK])[1:-1]
+            yield "]"
+        else:
+            yield _ENC.encode(v)
+    yield "}"
+
+
+# ── write / read ────────────────────────────────────────────────────
+def write(path: Path, results: dict) -> Path:
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt", encoding="utf-8") as fh:
+        for part in _chunks(results):
+            fh.write(part)
+    return path
+
+
+def read_bytes(path: Path) -> bytes:
+    raw = Path(path).read_bytes()
+    if path.name.endswith(".b64"):
+        raw = base64.b64decode(raw)
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    return raw
+
+
+def read(path: Path) -> dict:
+    return json.loads(read_bytes(Path(path)))
+
+
+def trades_frame(results: dict) -> pd.DataFrame:
+    """trade_log records → DataFrame with tz-aware entry/exit times."""
+    df = pd.DataFrame.from_records(results.get("trade_log") or [])
+    for col in ("entry_time", "exit_time"):
+        if col in df:
+            df[col] = pd.to_datetime(df[col], utc=True, format="ISO8601")
+    return df
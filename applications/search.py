@@ -0,0 +1,234 @@
+"""
+search.py – successive-halving parameter search over PARAM_SCHEMA
+-----------------------------------------------------------------
+CLI example:
+    python applications/search.py \
+           --engine 001/v6.02 --from 2025-03-01 --to 2025-03-31 \
+           --n 81 --eta 3 --min-days 7 --jobs 8 \
+           --space base_z=1.6:2.4,step_z=0.1:0.5
+
+Rung 0 replays all `n` random candidates on the first `min-days` of the
+range, keeps the best 1/eta, and every following rung re-runs the
+survivors on an eta-times longer slice until the last rung covers the
+full range.  Bars are loaded once; workers get them via the pool
+initializer.
+
+Search space per param (first match wins):
+    --space key=lo:hi        CLI override
+    PARAM_SCHEMA min / max   if the engine declares them
+    default · (1 ± span)     otherwise (--span, default 0.5)
+int params draw from ceil(lo)…floor(hi); lo > hi is an error.
+
+A candidate with fewer than --min-trades trades on a rung scores -inf,
+and profit_factor is capped at PF_CAP (no losing trade → PF_CAP), so
+a handful of lucky trades cannot top the ranking.
+
+Writes JSON to:
+    <engine folder>/results/search_<UTC-timestamp>.json
+Echoes one line:
+    JSON: <engine>/results/search_<file>.json
+"""
+
+# ── make project root importable ────────────────────────────────────
+import sys, pathlib, argparse, json, datetime, math, random
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from applications import registry
+from applications.backtest_wrapper import (ENGINE_ROOT, TF_CHOICES,
+                                           load_bars, load_engine)
+from applications.registry import schema_defaults
+
+MIN_TRADES = 10
+PF_CAP     = 10.0
+
+# ── worker globals (filled once per process by _init) ───────────────
+_ENGINE = None
+_BARS   = None
+
+
+def _init(engine_path: str, bars: pd.DataFrame) -> None:
+    global _ENGINE, _BARS
+    _ENGINE, _BARS = load_engine(engine_path), bars
+
+
+# ── search space ────────────────────────────────────────────────────
+def _bounds(key, spec, space, span):
+    if key in space:
+        return space[key]
+    if isinstance(spec, dict) and "min" in spec and "max" in spec:
+        return spec["min"], spec["max"]
+    d = spec["default"] if isinstance(spec, dict) else spec
+    return sorted((d * (1 - span), d * (1 + span)))
+
+
+def _range(key, spec, space, span):
+    lo, hi = _bounds(key, spec, space, span)
+    if lo > hi:
+        raise ValueError(f"{key}: empty search range {lo}…{hi}")
+    return lo, hi
+
+
+def sample_candidates(schema: dict, n: int, space: dict,
+                      span: float = 0.5, seed: int = 0) -> list:
+    """`n` random cfgs; candidate 0 is always the schema defaults."""
+    rng  = random.Random(seed)
+    out  = [schema_defaults(schema)]
+    while len(out) < n:
+        cand = {}
+        for key, spec in schema.items():
+            if isinstance(spec, dict) and "choices" in spec:
+                cand[key] = rng.choice(spec["choices"])
+                continue
+            lo, hi = _range(key, spec, space, span)
+            kind = spec.get("type") if isinstance(spec, dict) else \
+                   ("int" if isinstance(spec, int) else "float")
+            if kind == "int":
+                a, b = math.ceil(lo), math.floor(hi)
+                if a > b:                         # no int inside, e.g. 2.2…2.8
+                    a = b = round((lo + hi) / 2)
+                cand[key] = rng.randint(a, b)
+            else:
+                cand[key] = float(f"{rng.uniform(lo, hi):.4g}")
+        out.append(cand)
+    return out[:n]
+
+
+def score(pips: pd.Series, metric: str, min_trades: int = MIN_TRADES) -> float:
+    if pips.empty or len(pips) < min_trades:
+        return -math.inf
+    if metric == "total_pips":
+        return float(pips.sum())
+    if metric == "expect_pips":
+        return float(pips.mean())
+    if metric == "profit_factor":
+        loss = -pips[pips < 0].sum()
+        return min(float(pips[pips > 0].sum() / loss), PF_CAP) if loss > 0 else PF_CAP
+    if metric == "sharpe":
+        sd = pips.std()
+        return float(pips.mean() / sd) if sd > 0 else -math.inf
+    raise ValueError(f"unknown metric: {metric}")
+
+
+def _evaluate(job):
+    """Worker: one candidate on one slice → (idx, score, trades)."""
+    idx, cfg, lo, hi, metric, min_trades = job
+    sl   = _BARS[(_BARS.index >= lo) & (_BARS.index < hi)].copy()
+    pips = registry.run(_ENGINE, sl, cfg)[0]["pips"]
+    return idx, score(pips, metric, min_trades), int(len(pips))
+
+
+# ── driver ──────────────────────────────────────────────────────────
+def rung_days(total_days: float, min_days: float, eta: int) -> list:
+    days, out = min_days, []
+    while days < total_days:
+        out.append(days)
+        days *= eta
+    return out + [total_days]
+
+
+def successive_halving(engine_path: str, bars: pd.DataFrame, cands: list,
+                       base_cfg: dict, min_days: float = 7, eta: int = 3,
+                       metric: str = "total_pips", jobs: int = 1,
+                       min_trades: int = MIN_TRADES) -> list:
+    """
+    Returns the final ranking as a list of dicts
+        {"rank", "cfg", "score", "trades", "rung", "days"}
+    best first.  Candidates knocked out early keep the score of the last
+    rung they reached, so the list covers every candidate.
+    """
+    t0, t1   = bars.index[0], bars.index[-1] + pd.Timedelta(minutes=1)
+    total    = (t1 - t0) / pd.Timedelta(days=1)
+    alive    = list(range(len(cands)))
+    history  = {}
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init,
+                             initargs=(engine_path, bars)) as pool:
+        for r, days in enumerate(rung_days(total, min_days, eta)):
+            hi   = min(t1, t0 + pd.Timedelta(days=days))
+            work = [(i, {**base_cfg, **cands[i]}, t0, hi, metric, min_trades)
+                    for i in alive]
+            for idx, sc, n in pool.map(_evaluate, work):
+                history[idx] = {"cfg": cands[idx], "score": sc, "trades": n,
+                                "rung": r, "days": round(days, 2)}
+            alive.sort(key=lambda i: history[i]["score"], reverse=True)
+            if hi >= t1:
+                break
+            alive = alive[:max(1, math.ceil(len(alive) / eta))]
+
+    ranking = sorted(history.values(),
+                     key=lambda h: (h["rung"], h["score"]), reverse=True)
+    for i, h in enumerate(ranking, 1):
+        h["rank"] = i
+    return ranking
+
+
+# ────────────────────────────────────────────────────────────────────
+def _parse_space(txt: str) -> dict:
+    space = {}
+    for item in filter(None, (txt or "").split(",")):
+        k, rng = item.split("=", 1)
+        lo, hi = rng.split(":")
+        space[k.strip()] = (float(lo), float(hi))
+    return space
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--engine", required=True, help="e.g. 001/v6.02")
+    ap.add_argument("--from", dest="start", required=True)
+    ap.add_argument("--to",   dest="end",   required=True)
+    ap.add_argument("--symbol", default="EURGBP")
+    ap.add_argument("--tf",     choices=TF_CHOICES, default="M1")
+    ap.add_argument("--n",   type=int,   default=81, help="rung-0 candidates")
+    ap.add_argument("--eta", type=int,   default=3,  help="keep 1/eta per rung")
+    ap.add_argument("--min-days", type=float, default=7)
+    ap.add_argument("--metric", default="total_pips",
+                    choices=["total_pips", "expect_pips",
+                             "profit_factor", "sharpe"])
+    ap.add_argument("--min-trades", type=int, default=MIN_TRADES,
+                    help="fewer trades on a rung scores -inf")
+    ap.add_argument("--space", type=str, help="key=lo:hi,key2=lo:hi")
+    ap.add_argument("--span",  type=float, default=0.5)
+    ap.add_argument("--seed",  type=int,   default=0)
+    ap.add_argument("--jobs",  type=int,   default=None)
+    ap.add_argument("--top",   type=int,   default=10)
+    args = ap.parse_args()
+
+    engine = load_engine(args.engine)
+    schema = getattr(engine, "PARAM_SCHEMA", None)
+    if not schema:
+        sys.exit(f"⚠️  {args.engine} has no PARAM_SCHEMA")
+    bars   = load_bars(args.symbol, args.start, args.end, tf=args.tf)
+    cands  = sample_candidates(schema, args.n, _parse_space(args.space),
+                               span=args.span, seed=args.seed)
+    base   = registry.default_cfg(engine)
+
+    ranking = successive_halving(args.engine, bars, cands, base,
+                                 min_days=args.min_days, eta=args.eta,
+                                 metric=args.metric, jobs=args.jobs,
+                                 min_trades=args.min_trades)
+
+    for h in ranking[:args.top]:
+        print(f"{h['rank']:>3}  {args.metric}={h['score']:>9.2f}  "
+              f"trades={h['trades']:>4}  days={h['days']:>5}  {h['cfg']}")
+
+    res_dir  = engine.ENGINE_SPEC.root / "results"
+    res_dir.mkdir(parents=True, exist_ok=True)
+    stamp    = datetime.datetime.utcnow().strftime("%Y-%m-%d_%H%M%S")
+    out_path = res_dir / f"search_{stamp}.json"
+    out_path.write_text(json.dumps({
+        "engine": args.engine, "symbol": args.symbol,
+        "from": args.start, "to": args.end, "metric": args.metric,
+        "n": args.n, "eta": args.eta, "min_days": args.min_days,
+        "min_trades": args.min_trades,
+        "ranking": ranking,
+    }, indent=2, default=str))
+    print("JSON:", out_path.relative_to(ENGINE_ROOT))
+    return 0
+
+# ────────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    sys.exit(main())
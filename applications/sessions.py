@@ -0,0 +1,104 @@
+"""
+sessions.py – precomputed session calendar (minute-of-day, day ids)
+-------------------------------------------------------------------
+    cal = calendar(df.index, ("07:00", "17:00"))          # Europe/London
+    df  = df[cal.mask]                                    # = between_time
+    for i, ts in enumerate(df.index):
+        if cal.day[i] != today: …                         # daily reset
+
+One vectorised pass per frame turns the UTC stamps into wall-clock
+nanoseconds in `tz` (offsets looked up once, so the March / October
+DST shifts land on the right bar) and derives, as int arrays:
+
+    mod        minute of the local day            0 … 1439
+    day        local calendar day, days since 1970-01-01
+    sess_day   session-day id: the day the session containing the bar
+               opened (differs from `day` only for overnight windows)
+    open_off   minutes since that session opened
+    close_off  minutes left until it closes (negative once past it)
+    mask       bar inside the window – inclusive both ends, exactly
+               like DataFrame.between_time / bars_sql.in_session
+
+so session slicing and daily resets become integer compares in the hot
+loop instead of tz_convert / between_time / ts.date() per bar.  tz=None
+keeps the index's own zone (a naive index counts as UTC).  Calendars
+are memoised per index object, like indicators.mr_indicators.
+"""
+
+from __future__ import annotations
+import weakref
+from typing import Dict, NamedTuple, Tuple
+import numpy as np
+import pandas as pd
+
+from applications.bars_sql import SESSION_TZ
+
+MIN_NS = 60 * 1_000_000_000
+DAY_NS = 1440 * MIN_NS
+
+_MEMO: Dict[Tuple, Tuple[weakref.ref, int, "Calendar"]] = {}
+
+
+class Calendar(NamedTuple):
+    mod:       np.ndarray          # int16
+    day:       np.ndarray          # int32
+    sess_day:  np.ndarray          # int32
+    open_off:  np.ndarray          # int32
+    close_off: np.ndarray          # int32
+    mask:      np.ndarray          # bool
+
+    def day_label(self, day: int) -> str:
+        """Day id → 'YYYY-MM-DD' (what str(ts.date()) gives)."""
+        return str(np.datetime64(int(day), "D"))
+
+
+def _ns_of_day(hhmm: str) -> int:
+    t = pd.Timestamp(hhmm)
+    return (t - t.normalize()).value
+
+
+def local_ns(idx: pd.DatetimeIndex, tz=SESSION_TZ) -> np.ndarray:
+    """Wall-clock epoch-ns of every stamp in `tz` (DST-aware)."""
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+    if tz is None:
+        tz = idx.tz
+    return idx.tz_convert(tz).tz_localize(None).asi8
+
+
+def _compute(idx: pd.DatetimeIndex, session, tz) -> Calendar:
+    loc = local_ns(idx, tz)
+    nod = loc % DAY_NS
+    day = loc // DAY_NS
+    if session is None:
+        o = 0
+        c = DAY_NS - 1
+    else:
+        o, c = _ns_of_day(session[0]), _ns_of_day(session[1])
+    if o <= c:
+        mask = (nod >= o) & (nod <= c)
+    else:                                         # overnight, e.g. 22:00-06:00
+        mask = (nod >= o) | (nod <= c)
+    sess = (loc - o) // DAY_NS
+    span = (c - o) % DAY_NS
+    off  = (loc - o) - sess * DAY_NS
+    return Calendar(mod=(nod // MIN_NS).astype(np.int16),
+                    day=day.astype(np.int32),
+                    sess_day=sess.astype(np.int32),
+                    open_off=(off // MIN_NS).astype(np.int32),
+                    close_off=((span - off) // MIN_NS).astype(np.int32),
+                    mask=mask)
+
+
+def calendar(idx: pd.DatetimeIndex, session: Tuple[str, str] | None = None,
+             tz=SESSION_TZ) -> Calendar:
+    """Session calendar for `idx` (memoised on the index object)."""
+    key = (id(idx), tuple(session) if session else None, str(tz))
+    hit = _MEMO.get(key)
+    if hit is not None and hit[0]() is idx and hit[1] == len(idx):
+        return hit[2]
+    out = _compute(idx, session, tz)
+    for k in [k for k, v in _MEMO.items() if v[0]() is None]:
+        del _MEMO[k]
+    _MEMO[key] = (weakref.ref(idx), len(idx), out)
+    return out
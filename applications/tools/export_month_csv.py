@@ -9,8 +9,19 @@ python export_month_csv.py EURGBP 2025-03 --tf M1
 
 # tick quotes for EURUSD March 2025
 python export_month_csv.py EURUSD 2025-03 --tf tick
+
+# same month out of a local DuckDB file instead of Postgres
+python export_month_csv.py EURGBP 2025-03 --source duckdb:data/forex.duckdb
+
+Tick months are streamed with COPY straight into the CSV
+(applications/pgcopy.py), so memory stays flat however many quotes the
+month holds; other TFs still go through pandas.
 """
-import argparse, calendar, datetime as dt, pathlib, sys, psycopg2, pandas as pd
+import argparse, calendar, datetime as dt, os, pathlib, sys, pandas as pd
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]      # project root
+sys.path.insert(0, str(ROOT))
+from applications import datasource
 
 PG_DSN     = "dbname=forex_data user=tradeops"      # adjust if needed
 DATA_ROOT  = pathlib.Path("/home/tradeops/strats/data").expanduser()
@@ -18,10 +29,10 @@ TABLE_MAP  = {"M1": "forex_rates_1m", "tick": "forex_quotes_raw"}  # add more TF
 
 def date_bounds(year:int, month:int):
     lo = dt.datetime(year, month, 1, tzinfo=dt.timezone.utc)
-    hi = dt.datetime(year, month, calendar.monthrange(year, month)[1], 23, 59, tzinfo=dt.timezone.utc)
+    hi = dt.datetime(year, month, calendar.monthrange(year, month)[1], 23, 59, 59, 999999, tzinfo=dt.timezone.utc)
     return lo, hi
 
-def fetch(symbol, tf, month):
+def query(symbol, tf, month):
     y, m = [int(x) for x in month.split("-")]
     lo, hi = date_bounds(y, m)
     tbl = TABLE_MAP.get(tf, f"forex_rates_{tf.lower()}")  # fallback pattern
@@ -33,25 +44,41 @@ def fetch(symbol, tf, month):
           AND  timestamp_utc BETWEEN %s AND %s
         ORDER  BY timestamp_utc
     """
-    with psycopg2.connect(PG_DSN) as con:
-        return pd.read_sql(sql, con, params=[symbol, lo, hi])
+    return sql, [symbol, lo, hi]
+
+def fetch(src, symbol, tf, month):
+    sql, params = query(symbol, tf, month)
+    return src.read(sql, params)
+
+def stream(src, symbol, tf, month, out_fp):
+    """COPY the month into out_fp; returns the row count (0: out_fp untouched)."""
+    sql, params = query(symbol, tf, month)
+    return src.copy_to_csv(sql, params, out_fp)
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("symbol")
     ap.add_argument("month", help="YYYY-MM")
     ap.add_argument("--tf", default="M1", choices=list(TABLE_MAP))
+    ap.add_argument("--source", default=os.environ.get("FOREX_SOURCE") or PG_DSN,
+                    help="Postgres DSN or duckdb:<file>")
     args = ap.parse_args()
-
-    df = fetch(args.symbol, args.tf, args.month)
-    if df.empty:
-        sys.exit(f"⚠️  no rows returned for {args.symbol} {args.month} ({args.tf})")
+    src  = datasource.open_source(args.source)
 
     out_dir = DATA_ROOT / args.symbol / args.tf
     out_dir.mkdir(parents=True, exist_ok=True)
     out_fp  = out_dir / f"{args.month}.csv"
-    df.to_csv(out_fp, index=False)
-    print(f"✅ {len(df):,} rows → {out_fp}")
+
+    if args.tf == "tick":
+        n = stream(src, args.symbol, args.tf, args.month, out_fp)
+    else:
+        df = fetch(src, args.symbol, args.tf, args.month)
+        n  = len(df)
+        if n:
+            df.to_csv(out_fp, index=False)
+    if not n:
+        sys.exit(f"⚠️  no rows returned for {args.symbol} {args.month} ({args.tf})")
+    print(f"✅ {n:,} rows → {out_fp}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Merge overlapping, time-sorted M1 CSV fragments into canonical cache months.
+
+Examples
+--------
+# v5.01 inputs, highest priority first (an earlier file wins a shared minute)
+python ingest_fragments.py EURGBP \
+    /home/tradeops/ChatGPT_Memory/forex_1m_2025-02-28_EURGBP.csv \
+    /home/tradeops/ChatGPT_Memory/forex_1m_EURGBP_fragments_2025-02-28_and_03-02.csv \
+    /home/tradeops/exports/forex_1m_Mar_2025_EURGBP.csv
+
+# let the last file win instead
+python ingest_fragments.py EURGBP a.csv b.csv --prefer last
+
+# rebuild the touched months from the fragments alone
+python ingest_fragments.py EURGBP a.csv b.csv --replace
+
+One streaming k-way merge (heapq.merge over csv readers, key = timestamp
+then source rank), so each row is read, compared and written once:
+O(n log k) for k files instead of concat + drop_duplicates + sort_values
+on every backtest run.  OHLC text is copied through untouched; the
+timestamp is rewritten as YYYY-MM-DDTHH:MM:SSZ (naive stamps are UTC).
+Rows of another symbol (when a file has a `symbol` column) or with an
+unparsable timestamp are skipped and counted.
+
+Cached months inside the fragments' first…last span join the merge as
+the lowest-priority source, so a fragment fills and overrides minutes
+but never drops the rest of a month; --replace leaves them out.  Each
+month lands in <DATA_ROOT>/<symbol>/M1/<YYYY-MM>.csv and is recorded in
+that directory's manifest (applications/manifest.py) – untrusted if it
+now covers less than the file it replaced.  A fragment that is not
+sorted aborts the run before anything is replaced.
+"""
+import argparse, csv, heapq, os, pathlib, sys
+from datetime import datetime, timezone
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]      # project root
+sys.path.insert(0, str(ROOT))
+from applications import manifest
+
+DATA_ROOT = pathlib.Path("/home/tradeops/strats/data").expanduser()
+OHLC      = ["open", "high", "low", "close"]
+
+def parse_ts(txt):
+    t = datetime.fromisoformat(txt.strip())
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return t.astimezone(timezone.utc)
+
+def rows(path, rank, symbol, stats):
+    """(ts, rank, ohlc) per usable row of one sorted fragment."""
+    st = stats[path] = {"read": 0, "kept": 0, "dups": 0, "skipped": 0}
+    prev = None
+    with open(path, newline="") as fh:
+        rd = csv.DictReader(fh)
+        has_sym = "symbol" in (rd.fieldnames or [])
+        for r in rd:
+            st["read"] += 1
+            if has_sym and r["symbol"] != symbol:
+                st["skipped"] += 1
+                continue
+            try:
+                ts = parse_ts(r["timestamp_utc"])
+            except (ValueError, TypeError):
+                st["skipped"] += 1
+                continue
+            if prev is not None and ts < prev:
+                raise SystemExit(f"❌ {path} is not sorted at {r['timestamp_utc']}")
+            prev = ts
+            yield ts, rank, [r[c] for c in OHLC]
+
+def edges(path):
+    """First and last parseable timestamps of a fragment (head + tail read)."""
+    with open(path, newline="") as fh:
+        rd = csv.DictReader(fh)
+        first = next((t for t in map(_try_ts, rd) if t), None)
+        fields = rd.fieldnames or []
+    with open(path, "rb") as fh:
+        fh.seek(max(0, os.path.getsize(path) - 65536))
+        tail = fh.read().decode(errors="replace").splitlines()[1:]
+    rows_back = csv.DictReader(reversed(tail), fieldnames=fields)
+    return first, next((t for t in map(_try_ts, rows_back) if t), None)
+
+def _try_ts(r):
+    try:
+        return parse_ts(r["timestamp_utc"])
+    except (ValueError, TypeError, AttributeError, KeyError):
+        return None
+
+def cached_months(out_dir, paths):
+    """Existing <YYYY-MM>.csv months the fragments can touch."""
+    spans = [e for e in map(edges, paths) if e[0] and e[1]]
+    if not spans:
+        return []
+    lo = min(a for a, _ in spans).strftime("%Y-%m")
+    hi = max(b for _, b in spans).strftime("%Y-%m")
+    return [fp for fp in sorted(out_dir.glob("*.csv")) if lo <= fp.stem <= hi]
+
+def merge(paths, symbol, stats, prefer="first"):
+    """Yield (ts, ohlc) once per minute; fills stats[path] as it goes."""
+    ranks = range(len(paths)) if prefer == "first" else range(len(paths), 0, -1)
+    srcs  = [rows(p, k, symbol, stats) for p, k in zip(paths, ranks)]
+    by_rank = dict(zip(ranks, paths))
+    last = None
+    for ts, rank, ohlc in heapq.merge(*srcs, key=lambda x: (x[0], x[1])):
+        if ts == last:
+            stats[by_rank[rank]]["dups"] += 1
+            continue
+        last = ts
+        stats[by_rank[rank]]["kept"] += 1
+        yield ts, ohlc
+
+def write_months(merged, out_dir):
+    """Stream merged rows into <YYYY-MM>.csv.part files; {month: rows}."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    done, ym, fh, wr = {}, None, None, None
+    try:
+        for ts, ohlc in merged:
+            m = ts.strftime("%Y-%m")
+            if m != ym:
+                if fh:
+                    fh.close()
+                ym = m
+                fh = open(out_dir / f"{ym}.csv.part", "w", newline="")
+                wr = csv.writer(fh)
+                wr.writerow(["timestamp_utc", *OHLC])
+                done[ym] = 0
+            wr.writerow([ts.strftime("%Y-%m-%dT%H:%M:%SZ"), *ohlc])
+            done[ym] += 1
+    except BaseException:
+        if fh:
+            fh.close()
+        for m in done:
+            (out_dir / f"{m}.csv.part").unlink(missing_ok=True)
+        raise
+    if fh:
+        fh.close()
+    return done
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("symbol")
+    ap.add_argument("files", nargs="+", help="sorted CSV fragments, priority order")
+    ap.add_argument("--prefer", choices=["first", "last"], default="first",
+                    help="which file wins a duplicate timestamp (default first)")
+    ap.add_argument("--replace", action="store_true",
+                    help="drop the cached rows of touched months instead of "
+                         "merging them in as the lowest-priority source")
+    ap.add_argument("--data-root", default=str(DATA_ROOT))
+    args = ap.parse_args()
+
+    out_dir = pathlib.Path(args.data_root) / args.symbol / "M1"
+    cache   = [] if args.replace else [str(fp) for fp in cached_months(out_dir, args.files)]
+    files   = (cache + args.files) if args.prefer == "last" else (args.files + cache)
+    stats   = {}
+    months  = write_months(merge(files, args.symbol, stats, args.prefer),
+                           out_dir)
+    for p, st in stats.items():
+        print(f"  {p}: read {st['read']:,}  kept {st['kept']:,}  "
+              f"dup {st['dups']:,}  skipped {st['skipped']:,}")
+    for ym, n in months.items():
+        fp   = out_dir / f"{ym}.csv"
+        prev = (manifest.entry(fp) or manifest.validate(fp, "M1")) if fp.exists() else None
+        os.replace(out_dir / f"{ym}.csv.part", fp)
+        e = manifest.record(fp, "M1", prev=prev)
+        flag = "trusted" if e["trusted"] else "UNTRUSTED"
+        print(f"✅ {n:,} rows → {fp}  ({flag}{', SHRANK' if e.get('shrank') else ''}, "
+              f"{len(e['gaps'])} gaps)")
+    if not months:
+        sys.exit(f"⚠️  no {args.symbol} rows in the given files")
+
+if __name__ == "__main__":
+    main()
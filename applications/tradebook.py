@@ -0,0 +1,102 @@
+"""
+tradebook.py – columnar trade log + equity curve for the σ-MR engines
+---------------------------------------------------------------------
+Closed trades go into preallocated typed arrays instead of one dict per
+trade; the trade log is built by a single DataFrame constructor and the
+equity curve by one cumsum plus a vectorised isoformat:
+
+    book = TradeBook()
+    ...                                           # per closed trade
+    book.add(pips, entry_ts.value, ts.value, LONG, MEAN, layer)
+    ...
+    trade_log, equity = book.build(tz=df.index.tz)
+
+Output contract is unchanged:
+    trade_log  pips · entry_time · exit_time · side · reason · layer
+    equity     [{'ts': exit_time.isoformat(), 'equity': running pips}, …]
+`cols=` picks the trade-log columns for engines that log fewer.
+"""
+
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+SIDES   = ("long", "short")
+REASONS = ("stop", "mean", "time")
+LONG, SHORT      = range(len(SIDES))
+STOP, MEAN, TIME = range(len(REASONS))
+
+TRADE_COLS = ["pips", "entry_time", "exit_time", "side", "reason", "layer"]
+_FIELDS = (("pips", np.float64), ("entry_ns", np.int64), ("exit_ns", np.int64),
+           ("side", np.int8), ("reason", np.int8), ("layer", np.int16))
+
+
+class TradeBook:
+    def __init__(self, capacity: int = 1024):
+        self.n = 0
+        for name, dt in _FIELDS:
+            setattr(self, name, np.empty(capacity, dtype=dt))
+
+    def _grow(self) -> None:
+        for name, _ in _FIELDS:
+            a = getattr(self, name)
+            setattr(self, name, np.resize(a, 2 * len(a)))
+
+    def add(self, pips: float, entry_ns: int, exit_ns: int,
+            side: int, reason: int, layer: int) -> None:
+        i = self.n
+        if i == len(self.pips):
+            self._grow()
+        self.pips[i], self.entry_ns[i], self.exit_ns[i] = pips, entry_ns, exit_ns
+        self.side[i], self.reason[i], self.layer[i] = side, reason, layer
+        self.n = i + 1
+
+    # ── output ──────────────────────────────────────────────────────
+    def build(self, tz=None, cols=TRADE_COLS) -> tuple:
+        n = self.n
+        exit_t = _times(self.exit_ns[:n], tz)
+        full = {
+            "pips":       self.pips[:n].copy(),
+            "entry_time": _times(self.entry_ns[:n], tz),
+            "exit_time":  exit_t,
+            "side":       np.array(SIDES, dtype=object)[self.side[:n]],
+            "reason":     np.array(REASONS, dtype=object)[self.reason[:n]],
+            "layer":      self.layer[:n].astype(np.int64),
+        }
+        trade_log = pd.DataFrame({c: full[c] for c in cols})
+        equity = [{"ts": t, "equity": e}
+                  for t, e in zip(isoformat(exit_t),
+                                  np.cumsum(self.pips[:n]).tolist())]
+        return trade_log, equity
+
+
+def _times(ns: np.ndarray, tz) -> pd.DatetimeIndex:
+    idx = pd.DatetimeIndex(ns.astype("datetime64[ns]"))
+    return idx.tz_localize("UTC").tz_convert(tz) if tz is not None else idx
+
+
+def isoformat(idx: pd.DatetimeIndex) -> list:
+    """[t.isoformat() for t in idx] without a Timestamp per element (NaT → None)."""
+    if len(idx) == 0:
+        return []
+    nat = idx.isna()
+    if nat.any():
+        out = [None] * len(idx)
+        for i, t in zip(np.flatnonzero(~nat), isoformat(idx[~nat])):
+            out[i] = t
+        return out
+    if (idx.asi8 % 1_000_000_000).any():           # sub-second: rare, exact
+        return [t.isoformat() for t in idx]
+    wall = idx.tz_localize(None) if idx.tz is not None else idx
+    body = np.datetime_as_string(wall.values, unit="s").astype(object)
+    if idx.tz is None:
+        return body.tolist()
+    off = (wall.asi8 - idx.asi8) // 1_000_000_000  # UTC offset, seconds
+    uniq, inv = np.unique(off, return_inverse=True)
+    tags = np.array([_offset(o) for o in uniq], dtype=object)
+    return (body + tags[inv]).tolist()
+
+
+def _offset(secs: int) -> str:
+    h, m = divmod(abs(int(secs)) // 60, 60)
+    return f"{'-' if secs < 0 else '+'}{h:02d}:{m:02d}"
@@ -2,64 +2,68 @@
 # Pure-Python mean-reversion back-test core
 # -----------------------------------------------------------
 import pandas as pd
-import numpy as np
+from applications.indicators import mr_indicators, day_range, edge_mask, windows
+from applications.sessions import calendar
 
 # ---- strategy-wide constants (hard-coded for clarity) -----
-MA_BARS   = 30
-SIG_BARS  = 5
-ATR_BARS  = 5
-SIG_FLOOR = 0.00030           # 3 p
 STOP_PIPS = 10                # hard stop (10 p)
 TIME_MIN  = 30                # time stop (minutes)
 ATR_GATE  = 1.3               # pips
 
+PARAM_SCHEMA = {
+    "base_z"    : {"type": "float", "default": 1.95},
+    "step_z"    : {"type": "float", "default": 0.25},
+    "drift"     : {"type": "float", "default": 0.001},
+    "edge_pct"  : {"type": "float", "default": 0.15},
+    "ticket_cap": {"type": "int",   "default": 5},
+    "ma_bars"   : {"type": "int",   "default": 30},
+    "sig_bars"  : {"type": "int",   "default": 5},
+    "atr_bars"  : {"type": "int",   "default": 5},
+    "sig_floor" : {"type": "float", "default": 0.00030},   # 3 p
+}
+
 # -----------------------------------------------------------
 def run_backtest(df: pd.DataFrame, cfg: dict) -> pd.Series:
     """
     Stateless back-test engine.
 
     df   : minute bars (tz-aware, 07:00–17:00 session, *no* warm-up rows)
-           must contain columns open, high, low, close
+           must contain columns open, high, low, close, indexed by
+           timestamp or with a timestamp_utc column; frames tagged
+           attrs["trusted"] (applications/manifest.py) skip the
+           coerce / dropna clean-up
     cfg  : {
              base_z   : float (e.g. 1.95),
              step_z   : float (e.g. 0.25),
              drift    : float (e.g. 0.001),
              edge_pct : float (e.g. 0.15),
-             ticket_cap  : int   (e.g. 5)
+             ticket_cap  : int   (e.g. 5),
+             ma_bars / sig_bars / atr_bars / sig_floor :
+                           indicator windows (default 30 / 5 / 5 / 0.0003)
            }
 
     Returns:
         pd.Series of pips for each closed trade.
     """
-    df['timestamp_utc'] = pd.to_datetime(df['timestamp_utc'], utc=True, errors='coerce')
-    df = df.set_index('timestamp_utc')
-    df = df.dropna(subset=['open', 'high', 'low', 'close'])  # defensive
-
-    # ---- indicators (vectorised) --------------------------
-    sma   = df.close.rolling(MA_BARS, 1).mean()
-    sigma = df.close.rolling(SIG_BARS, 1).std().clip(lower=SIG_FLOOR)
-    z     = (df.close - sma) / sigma
-
-    prev  = df.close.shift()
-    tr    = np.maximum(df.high - df.low,
-                       np.maximum((df.high - prev).abs(),
-                                  (df.low  - prev).abs()))
-    atr   = tr.rolling(ATR_BARS, 1).mean()*1e4
+    if df.attrs.get('trusted'):                  # manifest-checked cache month
+        if 'timestamp_utc' in df.columns:
+            df = df.set_index('timestamp_utc')
+    else:
+        if 'timestamp_utc' in df.columns:        # raw CSV frame
+            df['timestamp_utc'] = pd.to_datetime(df['timestamp_utc'], utc=True, errors='coerce')
+            df = df.set_index('timestamp_utc')
+        df = df.dropna(subset=['open', 'high', 'low', 'close'])  # defensive
+
+    # ---- indicators (vectorised, applications/indicators.py bank) ----
+    ind   = mr_indicators(df, *windows(cfg))
+    sma, z, atr = ind.sma, ind.z, ind.atr        # atr in pips
 
     # ---- main loop ----------------------------------------
     trades, opens = [], []
-    today = None
-    hi = lo = None
-
-    for ts, row in df.iterrows():
-        if row.name.date() != today:
-            today = row.name.date()
-            hi, lo = row.high, row.low
-
-        hi = max(hi, row.high)
-        lo = min(lo, row.low)
-        rng = hi - lo
+    days = calendar(df.index, tz=None).day                # local day ids
+    edge = edge_mask(z, day_range(df, days).pos, cfg["edge_pct"]).tolist()
 
+    for i, (ts, row) in enumerate(df.iterrows()):
         # ---- exits ----------------------------------------
         still = []
         for side, ep, et, layer in opens:
@@ -88,9 +92,7 @@ def run_backtest(df: pd.DataFrame, cfg: dict) -> pd.Series:
         if abs(row.close - sma.loc[ts]) / sma.loc[ts] < cfg["drift"]:
             continue
 
-        pos   = (row.close - lo) / rng if rng else 0.5
-        if  row.z > 0 and pos > (1 - cfg["edge_pct"]): continue  # long blocked high
-        if  row.z < 0 and pos < cfg["edge_pct"]:       continue  # short blocked low
+        if edge[i]: continue             # long blocked high / short blocked low
 
         longs  = sum(1 for s,_,_,_ in opens if s == "long")
         shorts = sum(1 for s,_,_,_ in opens if s == "short")
@@ -3,21 +3,32 @@
 # Exported artifacts
 #   PARAM_SCHEMA        : Tunables + defaults
 #   run_backtest(df, cfg) -> (trade_log_df, equity_list)
+#   run_backtest_stream(frames, cfg)   same, fed an iterable of chunks
 #
 # df expectations
 #   • tz-aware minute bars, already sliced to session (07:00-17:00 UK)
+#     or cfg["session"] = ("07:00","17:00") in the index's own zone
 #   • columns: open, high, low, close
 #   • FIRST 30 warm-up rows per day removed
 #
 # trade_log DataFrame cols  (all UTC)
 #   pips · entry_time · exit_time · side · reason · layer
+#   .attrs["entry_guards"]  per-guard rejections by hour / day
+#   .attrs["exposure"]      per-bar tickets / net / MTM pips when
+#                           cfg["exposure"] is set (applications/exposure.py)
 # equity_list            (for PNG builder / chart)
 #   [{'ts': "2025-03-01T08:31:00Z", 'equity': 12.3}, …]
 # ---------------------------------------------------------------
 
 from __future__ import annotations
 import pandas as pd, numpy as np
-from typing import List, Dict
+from typing import Dict, Iterable, List
+from applications import exposure, perf
+from applications.guards import GuardStats, SEEN, CAP, ATR, DRIFT, EDGE, NO_SIGNAL
+from applications.indicators import (mr_indicators, day_range, edge_mask,
+                                     warm_bars, windows)
+from applications.sessions import calendar
+from applications.tradebook import TradeBook, LONG, SHORT, STOP, MEAN, TIME
 
 # ---- tunable schema ---------------------------------------------------------
 PARAM_SCHEMA: Dict[str, Dict[str, object]] = {
@@ -26,14 +37,15 @@ PARAM_SCHEMA: Dict[str, Dict[str, object]] = {
     "drift"    : {"type": "float", "default": 0.001},   # 0.10 %
     "edge_pct" : {"type": "float", "default": 0.15},    # 15 %
     "ticket_cap": {"type": "int",  "default": 5},
+    # indicator windows (applications/indicators.py bank, any mix is cheap)
+    "ma_bars"  : {"type": "int",   "default": 30,      "min": 10,     "max": 60},
+    "sig_bars" : {"type": "int",   "default": 5,       "min": 3,      "max": 20},
+    "atr_bars" : {"type": "int",   "default": 5,       "min": 3,      "max": 20},
+    "sig_floor": {"type": "float", "default": 0.00030, "min": 0.0001, "max": 0.0006},
     # ► room for future params (ATR_GATE, stop_pips…) ◄
 }
 
 # ---- strategy constants (hard-wired for v1.0) -------------------------------
-MA_BARS   = 30
-SIG_BARS  = 5
-ATR_BARS  = 5
-SIG_FLOOR = 0.00030      # 3 p
 STOP_PIPS = 10           # hard stop
 TIME_MIN  = 30           # time stop (minutes)
 ATR_GATE  = 1.3          # pips
@@ -46,94 +58,119 @@ def run_backtest(df: pd.DataFrame, cfg: dict) -> tuple[pd.DataFrame, List[dict]]
         trade_log : DataFrame (pips, entry_time, exit_time, side, reason, layer)
         equity    : list[dict] (ts, equity)
     """
-    # ── optional session slice ───────────────────────────────────────────
-    session = cfg.get("session")          # e.g. ("07:00","17:00") or None
-    if session:
-        lo, hi = session
-        df = df.between_time(lo, hi)
+    return run_backtest_stream([df], cfg)
 
 
+def run_backtest_stream(frames: Iterable[pd.DataFrame],
+                        cfg: dict) -> tuple[pd.DataFrame, List[dict]]:
+    """Same engine fed chunk by chunk (e.g. backtest_wrapper.iter_bars).
 
-
-    # ---- indicators ---------------------------------------------------------
-    sma   = df.close.rolling(MA_BARS, 1).mean()
-    sigma = df.close.rolling(SIG_BARS, 1).std().clip(lower=SIG_FLOOR)
-    z     = (df.close - sma) / sigma
-    df['z'] = z  # so row.z is usable below
-
-    prev  = df.close.shift()
-    tr    = np.maximum(df.high - df.low,
-                       np.maximum((df.high - prev).abs(),
-                                  (df.low  - prev).abs()))
-    atr   = tr.rolling(ATR_BARS, 1).mean() * 1e4  # pips
-
-    # ---- main loop ----------------------------------------------------------
+    Open tickets and the daily range carry over between chunks; the last
+    warm_bars(...) rows of each chunk are prepended to the next one so
+    the rolling indicators match a single run over the concatenated bars.
+    """
+    win  = windows(cfg)              # (ma_bars, sig_bars, atr_bars, sig_floor)
+    keep = warm_bars(*win)
     opens = []                       # [(side, entry_px, entry_ts, layer)]
-    log_rows = []                    # append dict per closed trade
-    today = hi = lo = None
-
-    for ts, row in df.iterrows():
-        # session-day reset
-        if ts.date() != today:
-            today, hi, lo = ts.date(), row.high, row.low
-        hi, lo = max(hi, row.high), min(lo, row.low)
-        rng = hi - lo
-
-        # ---- check exits ----------------------------------------------------
-        still = []
-        for side, ep, et, layer in opens:
-            hold = (ts - et).total_seconds() / 60
-            exit_flag = False; px = None; reason = None
-            if side == "long":
-                if row.low  <= ep - STOP_PIPS/1e4: px, exit_flag, reason = ep - STOP_PIPS/1e4, True, "stop"
-                elif row.close >= sma.loc[ts]:     px, exit_flag, reason = row.close, True, "mean"
-                elif hold >= TIME_MIN:            px, exit_flag, reason = row.close, True, "time"
-            else:
-                if row.high >= ep + STOP_PIPS/1e4: px, exit_flag, reason = ep + STOP_PIPS/1e4, True, "stop"
-                elif row.close <= sma.loc[ts]:     px, exit_flag, reason = row.close, True, "mean"
-                elif hold >= TIME_MIN:            px, exit_flag, reason = row.close, True, "time"
-            if exit_flag:
-                pips = (px - ep)*1e4 if side == "long" else (ep - px)*1e4
-                log_rows.append({
-                    "pips":       pips,
-                    "entry_time": et,
-                    "exit_time":  ts,
-                    "side":       side,
-                    "reason":     reason,
-                    "layer":      layer
-                })
-            else:
-                still.append((side, ep, et, layer))
-        opens = still
-
-        # ---- entry guards ---------------------------------------------------
-        if len(opens) >= cfg["ticket_cap"]:                 continue
-        if pd.isna(row.z) or atr.loc[ts] < ATR_GATE:        continue
-        if abs(row.close - sma.loc[ts]) / sma.loc[ts] < cfg["drift"]: continue
-
-        pos = (row.close - lo) / rng if rng else 0.5
-        if row.z > 0 and pos > (1 - cfg["edge_pct"]): continue  # high of range
-        if row.z < 0 and pos < cfg["edge_pct"]:       continue  # low  of range
-
-        longs  = sum(1 for s,_,_,_ in opens if s == "long")
-        shorts = sum(1 for s,_,_,_ in opens if s == "short")
-
-        # ---- entries --------------------------------------------------------
-        if row.z <= -cfg["base_z"]:
-            need = cfg["base_z"] + cfg["step_z"]*longs
-            if abs(row.z) >= need:
-                opens.append(("long", row.close, ts, longs+1))
-        elif row.z >= cfg["base_z"]:
-            need = cfg["base_z"] + cfg["step_z"]*shorts
-            if abs(row.z) >= need:
-                opens.append(("short", row.close, ts, shorts+1))
-
-    # ---- equity construction ----------------------------------------------
-    bal = 0
-    equity = []
-    for row in log_rows:
-        bal += row["pips"]
-        equity.append({"ts": row["exit_time"].isoformat(), "equity": bal})
-
-    trade_log = pd.DataFrame(log_rows)
+    book = TradeBook()               # closed trades, columnar
+    tz = None
+    today = carry = None             # carry: (day, hi, lo) across chunks
+    tail = None
+    gs = GuardStats()
+    g_hr, g_day = gs.hour, None
+    seen = [] if cfg.get("exposure") else None     # bars for the MTM timeline
+
+    for df in frames:
+        # ── optional session slice ───────────────────────────────────────
+        session = cfg.get("session")      # e.g. ("07:00","17:00") or None
+        if session:                       # = between_time, integer compares
+            df = df[calendar(df.index, session, tz=None).mask]
+        if df.empty:
+            continue
+        warm = 0 if tail is None else len(tail)
+        if warm:
+            df = pd.concat([tail, df])
+        tail = df.iloc[-keep:]
+        tz = df.index.tz
+        if seen is not None:
+            seen.append(df.iloc[warm:][["high", "low", "close"]])
+
+        # ---- indicators -----------------------------------------------------
+        with perf.phase("indicators"):
+            ind   = mr_indicators(df, *win)
+            sma, z, atr = ind.sma, ind.z, ind.atr    # atr in pips
+            cal   = calendar(df.index, tz=None)      # day ids / minute-of-day
+            rr    = day_range(df, cal.day, carry)    # running session-day range
+            carry = (cal.day[-1], rr.hi.iat[-1], rr.lo.iat[-1])
+            edge  = edge_mask(z, rr.pos, cfg["edge_pct"])[warm:].tolist()
+
+        # ---- main loop ------------------------------------------------------
+        days  = cal.day[warm:].tolist()
+        hours = (cal.mod[warm:] // 60).tolist()
+
+        perf.count("bars", len(df) - warm)
+        with perf.phase("loop"):
+            for i, (ts, row) in enumerate(df.iloc[warm:].iterrows()):
+                # session-day reset
+                if days[i] != today:
+                    today = days[i]
+                    g_day = gs.new_day(cal.day_label(today))
+
+                # ---- check exits --------------------------------------------
+                still = []
+                for side, ep, et, layer in opens:
+                    hold = (ts - et).total_seconds() / 60
+                    exit_flag = False; px = None; reason = None
+                    if side == "long":
+                        if row.low  <= ep - STOP_PIPS/1e4: px, exit_flag, reason = ep - STOP_PIPS/1e4, True, STOP
+                        elif row.close >= sma.loc[ts]:     px, exit_flag, reason = row.close, True, MEAN
+                        elif hold >= TIME_MIN:            px, exit_flag, reason = row.close, True, TIME
+                    else:
+                        if row.high >= ep + STOP_PIPS/1e4: px, exit_flag, reason = ep + STOP_PIPS/1e4, True, STOP
+                        elif row.close <= sma.loc[ts]:     px, exit_flag, reason = row.close, True, MEAN
+                        elif hold >= TIME_MIN:            px, exit_flag, reason = row.close, True, TIME
+                    if exit_flag:
+                        if side == "long":
+                            book.add((px - ep)*1e4, et.value, ts.value, LONG,  reason, layer)
+                        else:
+                            book.add((ep - px)*1e4, et.value, ts.value, SHORT, reason, layer)
+                    else:
+                        still.append((side, ep, et, layer))
+                opens = still
+
+                # ---- entry guards (each rejection counted per hour/day) --------
+                h = hours[i]
+                g_hr[SEEN, h] += 1; g_day[SEEN] += 1
+                if len(opens) >= cfg["ticket_cap"]:
+                    g_hr[CAP, h] += 1; g_day[CAP] += 1;     continue
+                zt = z.loc[ts]
+                if pd.isna(zt) or atr.loc[ts] < ATR_GATE:
+                    g_hr[ATR, h] += 1; g_day[ATR] += 1;     continue
+                if abs(row.close - sma.loc[ts]) / sma.loc[ts] < cfg["drift"]:
+                    g_hr[DRIFT, h] += 1; g_day[DRIFT] += 1; continue
+
+                if edge[i]:                       # z stretched into the day's edge
+                    g_hr[EDGE, h] += 1; g_day[EDGE] += 1;   continue
+
+                longs  = sum(1 for s,_,_,_ in opens if s == "long")
+                shorts = sum(1 for s,_,_,_ in opens if s == "short")
+
+                # ---- entries ------------------------------------------------
+                n_open = len(opens)
+                if zt <= -cfg["base_z"]:
+                    need = cfg["base_z"] + cfg["step_z"]*longs
+                    if abs(zt) >= need:
+                        opens.append(("long", row.close, ts, longs+1))
+                elif zt >= cfg["base_z"]:
+                    need = cfg["base_z"] + cfg["step_z"]*shorts
+                    if abs(zt) >= need:
+                        opens.append(("short", row.close, ts, shorts+1))
+                if len(opens) == n_open:
+                    g_hr[NO_SIGNAL, h] += 1; g_day[NO_SIGNAL] += 1
+
+    # ---- trade log + equity (one columnar build, cumsum equity) ------------
+    trade_log, equity = book.build(tz)
+    trade_log.attrs["entry_guards"] = gs.report()
+    if seen:                                      # per-bar MTM / exposure
+        trade_log.attrs["exposure"] = exposure.from_book(pd.concat(seen), book, opens)
     return trade_log, equity